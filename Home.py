@@ -7,210 +7,396 @@ and a filterable table of housing units from the database.
 """
 
 import pandas as pd
+import numpy as np
 import folium
 from folium import plugins
 import streamlit as st
+import streamlit.components.v1 as components
 from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
-import time
-from typing import Optional, Dict, List
-from firestore_service import firestore_service
-import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import math
-from streamlit_folium import st_folium
+from geopy.adapters import AioHTTPAdapter
+from geopy.extra.rate_limiter import AsyncRateLimiter
+import asyncio
+from typing import Optional, Dict, List, Tuple
+from firestore_service import firestore_service, fetch_unit, flatten_amenities, split_utilities
+from popup_utils import POPUP_TMPL
+import aiohttp
 import json
+from functools import reduce
+from itertools import groupby
+
+# Columns read by the map markers, in the order they are unpacked
+MAP_COLUMNS = ['latitude', 'longitude', 'status', 'property_address', 'unit', 'bedrooms', 'area', 'square_feet']
+
+# Columns holding nested dicts, which need stringifying before Arrow display
+DICT_COLUMNS = ['amenities', 'utilities', 'subsidy']
+
+# Marker color/icon per unit status
+STATUS_STYLES = {
+    'favorite': {'color': 'red', 'icon': 'heart'},
+    'available': {'color': 'blue', 'icon': 'home'},
+    'not_interested': {'color': 'gray', 'icon': 'remove'},
+    'off_market': {'color': 'black', 'icon': 'ban'},
+    'default': {'color': 'purple', 'icon': 'question'}
+}
+
+# Leaflet callback turning a [lat, lon, popup_html, tooltip, color, icon] row into a marker
+MARKER_CALLBACK = """function (row) {
+    var icon = L.AwesomeMarkers.icon({icon: row[5], markerColor: row[4], prefix: 'fa'});
+    var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icon});
+    marker.bindPopup(row[2], {maxWidth: 320});
+    marker.bindTooltip(row[3]);
+    return marker;
+}"""
+
+# Sort menu label -> (column, ascending)
+_SORT_COLS = {
+    'Address': ('property_address', True),
+    'Bedrooms': ('bedrooms', True),
+    'Square Feet': ('square_feet', False),
+    'Status': ('status', True),
+    'Area': ('area', True),
+}
+
+# Unit cards rendered per page
+PAGE_SIZE = 20
+
+# Low-cardinality columns kept as pandas categoricals
+CATEGORY_COLUMNS = ['status', 'area', 'zip_code']
+
+# Local scraper API and its request policy
+SCRAPER_API_URL = "http://127.0.0.1:8000/scrape"
+SCRAPE_TIMEOUT = aiohttp.ClientTimeout(total=30)
+SCRAPE_RETRIES = 3
+RETRY_STATUSES = {502, 503, 504}
+
+# Unit fields stored with a geocoding failure (what the failures page shows)
+FAILURE_FIELDS = ('id', 'property_address', 'unit', 'zip_code')
+
+def to_firestore_value(value):
+    """Converts a DataFrame cell (numpy scalar, NaN) into a value Firestore can encode."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
 
 # --- Data Processing Class ---
 class HousingDataProcessor:
-    def __init__(self, batch_size=4, max_workers=4):
-        self.geocoder = Nominatim(user_agent="housing_map_generator")
-        self.session = requests.Session()
-        self.batch_size = batch_size
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
-
-    def _geocode_address(self, address: str, zip_code: str, retries: int = 3) -> Optional[Dict]:
-        """Geocode a single address with retry logic."""
-        full_address = f"{address}, {zip_code}, Los Angeles, CA"
-        for attempt in range(retries):
-            try:
-                location = self.geocoder.geocode(full_address, timeout=10)
-                if location:
-                    return {
-                        'latitude': location.latitude,
-                        'longitude': location.longitude,
-                        'display_name': location.address
-                    }
-                time.sleep(1)
-            except (GeocoderTimedOut, GeocoderUnavailable):
-                if attempt < retries - 1:
-                    time.sleep(2)
-        return None
+    def __init__(self, concurrency=32):
+        # Upper bound on simultaneous requests to the scraper API
+        self.concurrency = concurrency
+
+    async def _geocode_batch(self, addresses: List[str]) -> List[Optional[Dict]]:
+        """Geocode many addresses through a single rate-limited async geocoder."""
+        async with Nominatim(user_agent="housing_map_generator", adapter_factory=AioHTTPAdapter, timeout=10) as geocoder:
+            # The rate limiter handles pacing and retries on timeouts/unavailability
+            geocode = AsyncRateLimiter(geocoder.geocode, min_delay_seconds=1.0, max_retries=2, error_wait_seconds=2.0)
+            locations = await asyncio.gather(*[geocode(address) for address in addresses])
+        return [
+            {
+                'latitude': location.latitude,
+                'longitude': location.longitude,
+                'display_name': location.address
+            } if location else None
+            for location in locations
+        ]
 
-    def _scrape_listing_data(self, listing_url: str) -> Optional[Dict]:
-        """Scrape data from a single listing URL."""
+    async def _ascrape(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, listing_url: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """Scrape data from a single listing URL, returning `(data, None)` or `(None, error)`."""
         if not listing_url or not listing_url.startswith('http'):
-            return None
-        try:
-            api_url = f"http://127.0.0.1:8000/scrape?url={listing_url}"
-            res = self.session.get(api_url, timeout=30)
-            res.raise_for_status()
-            return res.json()
-        except requests.RequestException as e:
-            st.error(f"Scraping failed for {listing_url}: {e}")
-            if hasattr(e, 'response') and e.response and e.response.status_code == 404:
-                return {'status': 'off_market'}
-        return None
+            return None, f"{listing_url}: not an http(s) link"
+        async with semaphore:
+            for attempt in range(SCRAPE_RETRIES + 1):
+                try:
+                    async with session.get(SCRAPER_API_URL, params={'url': listing_url}, timeout=SCRAPE_TIMEOUT) as res:
+                        if res.status in RETRY_STATUSES and attempt < SCRAPE_RETRIES:
+                            await asyncio.sleep(0.3 * 2 ** attempt)
+                            continue
+                        if res.status == 404:
+                            return {'status': 'off_market'}, None
+                        res.raise_for_status()
+                        return await res.json(), None
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    return None, f"{listing_url}: {e}"
+        return None, f"{listing_url}: retries exhausted"
 
-    def _process_unit(self, unit_row):
-        """Geocode and scrape a single unit."""
-        # Handle different types of row objects (Series, dict, etc.)
-        if hasattr(unit_row, 'get'):  # Series or dict-like
-            unit_id = unit_row.get('id') or getattr(unit_row, 'name', None)
-            address = unit_row.get('property_address', '')
-            zip_code = str(unit_row.get('zip_code', ''))
-            listing_url = unit_row.get('listing_link')
-            latitude = unit_row.get('latitude')
-        else:  # Handle named tuple or other object types
-            unit_id = getattr(unit_row, 'id', None) or getattr(unit_row, 'Index', None)
-            address = getattr(unit_row, 'property_address', '')
-            zip_code = str(getattr(unit_row, 'zip_code', ''))
-            listing_url = getattr(unit_row, 'listing_link', None)
-            latitude = getattr(unit_row, 'latitude', None)
-
-        # 1. Geocode if needed
-        if pd.isnull(latitude):
-            coords = self._geocode_address(address, zip_code)
-            if coords:
-                firestore_service.update_unit(unit_id, coords)
-            else:
-                # Convert row to dict for logging
-                if hasattr(unit_row, 'to_dict'):
-                    row_dict = unit_row.to_dict()
-                elif hasattr(unit_row, '_asdict'):
-                    row_dict = unit_row._asdict()
-                else:
-                    row_dict = {'id': unit_id, 'property_address': address, 'zip_code': zip_code}
-                firestore_service.log_geocoding_failure(row_dict, "Geocoding failed")
-                return unit_id, "Geocoding Failed"
-
-        # 2. Scrape (if listing link exists)
-        if listing_url:
-            scraped_data = self._scrape_listing_data(listing_url)
-            if scraped_data:
-                if scraped_data.get('status') == 'off_market':
-                    firestore_service.update_unit(unit_id, {'status': 'off_market'})
-                else:
-                    firestore_service.update_unit(unit_id, scraped_data)
-                return unit_id, "Processed"
-            return unit_id, "Scraping Failed"
-        
-        return unit_id, "Processed (No Scrape)"
+    async def _scrape_all(self, listing_urls: List[str], progress_bar) -> List[Tuple[Optional[Dict], Optional[str]]]:
+        """Scrape every URL over one pooled session; results keep the input order."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        results: List[Tuple[Optional[Dict], Optional[str]]] = [(None, None)] * len(listing_urls)
+
+        async def scrape_at(i, url):
+            return i, await self._ascrape(session, semaphore, url)
+
+        async with aiohttp.ClientSession(connector=connector) as session:
+            tasks = [scrape_at(i, url) for i, url in enumerate(listing_urls)]
+            for done_count, next_done in enumerate(asyncio.as_completed(tasks), 1):
+                i, result = await next_done
+                results[i] = result
+                progress_bar.progress(done_count / len(listing_urls))
+        return results
 
     def process_all_units(self, units_df: pd.DataFrame, status_text, progress_bar) -> Dict[str, int]:
-        """Process all units in batches using multithreading."""
-        # Check if latitude column exists and filter units that need geocoding
-        if 'latitude' in units_df.columns:
-            units_to_process = units_df[
-                pd.to_numeric(units_df['latitude'], errors='coerce').isnull()
-            ].copy()
-        else:
-            # If no latitude column, all units need processing
-            units_to_process = units_df.copy()
+        """Geocode all units in one async batch, then scrape them concurrently over aiohttp."""
+        # Filter units that need geocoding (only read from here on, so no copy)
+        units_to_process = units_df.loc[compute_needs_geocode_mask(units_df)]
 
         total_units = len(units_to_process)
         if total_units == 0:
             status_text.info("✅ All units appear to be geocoded.")
             return {"processed": 0, "geocoding_failed": 0, "scraping_failed": 0, "processed_no_scrape": 0}
         
-        num_batches = math.ceil(total_units / self.batch_size)
         results = {"processed": 0, "geocoding_failed": 0, "scraping_failed": 0, "processed_no_scrape": 0}
-        
-        for i in range(num_batches):
-            batch_df = units_to_process.iloc[i*self.batch_size:(i+1)*self.batch_size]
-            status_text.info(f"Processing Batch {i+1}/{num_batches}...")
-            
-            # Submit each row for processing
-            futures = []
-            for idx, row in batch_df.iterrows():
-                future = self.executor.submit(self._process_unit, row)
-                futures.append(future)
-            
-            for future in as_completed(futures):
-                _, result_status = future.result()
-                if result_status == "Processed":
-                    results["processed"] += 1
-                elif result_status == "Geocoding Failed":
-                    results["geocoding_failed"] += 1
-                elif result_status == "Scraping Failed":
-                    results["scraping_failed"] += 1
-                elif result_status == "Processed (No Scrape)":
-                    results["processed_no_scrape"] += 1
-
-            progress_bar.progress((i + 1) / num_batches)
+
+        # Plain dicts, converted once, instead of a Series per row
+        records = units_to_process.to_dict('records')
+        unit_ids = [record.get('id') or idx for idx, record in zip(units_to_process.index, records)]
+
+        # 1. Geocode every address up front in a single batch
+        status_text.info(f"Geocoding {total_units} addresses...")
+        addresses = [
+            f"{record.get('property_address', '')}, {record.get('zip_code', '')}, Los Angeles, CA"
+            for record in records
+        ]
+        geocoded = asyncio.run(self._geocode_batch(addresses))
+
+        coord_updates = []
+        scrape_ids, listing_urls = [], []
+        for unit_id, record, coords in zip(unit_ids, records, geocoded):
+            if coords:
+                coord_updates.append((unit_id, coords))
+                # Only the units geocoded successfully go on to be scraped
+                scrape_ids.append(unit_id)
+                url = record.get('listing_link')
+                listing_urls.append(url if isinstance(url, str) else None)
+            else:
+                # Snapshot rows carry numpy scalars and NaN that Firestore rejects
+                failure_record = {field: to_firestore_value(record[field]) for field in FAILURE_FIELDS if field in record}
+                firestore_service.log_geocoding_failure(failure_record, "Geocoding failed")
+                results["geocoding_failed"] += 1
+        firestore_service.bulk_update(coord_updates)
+
+        # 2. Scrape the units that were geocoded successfully
+        to_scrape = [i for i, url in enumerate(listing_urls) if url]
+        results["processed_no_scrape"] = len(listing_urls) - len(to_scrape)
+
+        status_text.info(f"Scraping {len(to_scrape)} listings...")
+        scraped = asyncio.run(self._scrape_all([listing_urls[i] for i in to_scrape], progress_bar)) if to_scrape else []
+
+        # Merge results back by position and write them in batched commits
+        scrape_updates = []
+        errors: List[str] = []
+        for i, (data, err) in zip(to_scrape, scraped):
+            if data:
+                payload = {'status': 'off_market'} if data.get('status') == 'off_market' else data
+                scrape_updates.append((scrape_ids[i], payload))
+                results["processed"] += 1
+            else:
+                results["scraping_failed"] += 1
+                if err:
+                    errors.append(err)
+        firestore_service.bulk_update(scrape_updates)
+
+        # Report all scrape failures once, after the batch
+        if errors:
+            st.error(f"Scraping failed for {len(errors)} listings.")
+            st.expander(f"{len(errors)} scrape failures").code('\n'.join(errors))
         return results
 
-    def create_popup_content(self, row: pd.Series) -> str:
-        """Create HTML content for a property's popup."""
-        content = f"""
-        <div style="width: 300px; font-family: Arial, sans-serif; font-size: 14px;">
-            <h4 style="margin: 0 0 10px 0; color: #2c3e50; font-size: 16px;">{row.get('property_address', 'N/A')}</h4>
-            <p style="margin: 4px 0;"><strong>Unit:</strong> {row.get('unit', 'N/A')}</p>
-            <p style="margin: 4px 0;"><strong>Status:</strong> {str(row.get('status', 'N/A')).replace('_', ' ').title()}</p>
-            <p style="margin: 4px 0;"><strong>Bedrooms:</strong> {row.get('bedrooms', 'N/A')}</p>
-            <p style="margin: 4px 0;"><strong>Neighborhood:</strong> {row.get('area', 'N/A')}</p>
-            <p style="margin: 4px 0;"><strong>Size:</strong> {row.get('square_feet', 'N/A')} sq ft</p>
-        </div>
-        """
-        return content
+    def create_map(self, map_records: tuple) -> folium.Map:
+        """Creates a Folium map with markers for geocoded housing units.
 
-    def create_map(self, map_data: pd.DataFrame) -> folium.Map:
-        """Creates a Folium map with markers for geocoded housing units."""
+        `map_records` holds plain tuples of the MAP_COLUMNS fields followed by the
+        marker color and icon (see get_map_records).
+        """
         center_lat, center_lon = 34.0522, -118.2437 # Default to LA
         m = folium.Map(location=[center_lat, center_lon], zoom_start=11, tiles='CartoDB positron')
         
-        if map_data.empty:
+        if not map_records:
             plugins.Fullscreen(position='topleft').add_to(m)
             return m
         
-        map_data['latitude'] = pd.to_numeric(map_data.get('latitude'), errors='coerce')
-        map_data['longitude'] = pd.to_numeric(map_data.get('longitude'), errors='coerce')
-        
-        geocoded_units = map_data.dropna(subset=['latitude', 'longitude'])
-        
-        if not geocoded_units.empty:
-            center_lat = geocoded_units['latitude'].mean()
-            center_lon = geocoded_units['longitude'].mean()
-            m.location = [center_lat, center_lon]
-
-        status_styles = {
-            'favorite': {'color': 'red', 'icon': 'heart'},
-            'available': {'color': 'blue', 'icon': 'home'},
-            'not_interested': {'color': 'gray', 'icon': 'remove'},
-            'off_market': {'color': 'black', 'icon': 'ban'},
-            'default': {'color': 'purple', 'icon': 'question'}
-        }
-        
-        marker_cluster = plugins.MarkerCluster().add_to(m)
-
-        for _, row in geocoded_units.iterrows():
-            style_key = row.get('status', 'default')
-            style = status_styles.get(style_key, status_styles['default'])
-            folium.Marker(
-                location=[row['latitude'], row['longitude']],
-                popup=folium.Popup(self.create_popup_content(row), max_width=320),
-                tooltip=f"{row.get('property_address', 'N/A')} ({str(style_key).title()})",
-                icon=folium.Icon(color=style['color'], icon=style['icon'], prefix='fa')
-            ).add_to(marker_cluster)
+        center_lat = sum(record[0] for record in map_records) / len(map_records)
+        center_lon = sum(record[1] for record in map_records) / len(map_records)
+        m.location = [center_lat, center_lon]
+
+        # Markers are built client-side by Leaflet from plain rows (see MARKER_CALLBACK)
+        marker_rows = [
+            [
+                float(lat),
+                float(lon),
+                POPUP_TMPL(
+                    address=address,
+                    unit=unit,
+                    status=str(status).replace('_', ' ').title(),
+                    bedrooms=bedrooms,
+                    area=area,
+                    square_feet=square_feet
+                ),
+                f"{address} ({str(status).title()})",
+                color,
+                icon
+            ]
+            for lat, lon, status, address, unit, bedrooms, area, square_feet, color, icon in map_records
+        ]
+        plugins.FastMarkerCluster(marker_rows, callback=MARKER_CALLBACK).add_to(m)
         
         plugins.Fullscreen(position='topleft').add_to(m)
         return m
 
 # --- Helper Functions ---
 @st.cache_data(ttl=300)
-def get_all_units_cached():
-    """Cached function to get all units."""
-    return firestore_service.get_all_units_as_df()
+def get_all_units_cached(data_version: int, snapshot_version: Optional[float] = None):
+    """
+    Cached function to get the display columns of all units.
+    `data_version` is bumped after writes in this session; `snapshot_version` (the
+    snapshot's mtime) re-keys the cache after writes from any session.
+    """
+    df = firestore_service.get_units_snapshot_df()
+    # Low-cardinality columns are stored as categoricals for fast isin/value_counts
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+def load_units_df() -> pd.DataFrame:
+    """
+    All units for this run, through the cache keyed on both data versions.
+    The key is kept in `st.session_state.units_version` for caches derived from the frame.
+    """
+    snapshot_version = firestore_service.snapshot_mtime()
+    if snapshot_version is None:
+        # A write from some session dropped the snapshot, so no cached frame is current
+        get_all_units_cached.clear()
+        build_amenity_index.clear()
+        sidebar_stats.clear()
+    units_version = (st.session_state.get('data_version', 0), snapshot_version)
+    st.session_state.units_version = units_version
+    return get_all_units_cached(*units_version)
+
+def get_map_records(map_data: pd.DataFrame) -> tuple:
+    """Extracts hashable (MAP_COLUMNS..., color, icon) tuples for every unit with valid coordinates."""
+    if map_data.empty or 'latitude' not in map_data.columns or 'longitude' not in map_data.columns:
+        return ()
+    latitudes = pd.to_numeric(map_data['latitude'], errors='coerce')
+    longitudes = pd.to_numeric(map_data['longitude'], errors='coerce')
+    geocoded = latitudes.notna() & longitudes.notna()
+    geocoded_units = map_data[geocoded]
+
+    # Pull the needed columns out as arrays once instead of building a Series per row
+    columns = [latitudes[geocoded].to_numpy(), longitudes[geocoded].to_numpy()] + [
+        geocoded_units[col].to_numpy() if col in geocoded_units.columns
+        else np.full(len(geocoded_units), 'N/A', dtype=object)
+        for col in MAP_COLUMNS[2:]
+    ]
+
+    # Resolve marker styles for the whole column at once
+    statuses = pd.Series(columns[2], dtype=object)
+    default_style = STATUS_STYLES['default']
+    colors = statuses.map({k: v['color'] for k, v in STATUS_STYLES.items()}).fillna(default_style['color'])
+    icons = statuses.map({k: v['icon'] for k, v in STATUS_STYLES.items()}).fillna(default_style['icon'])
+    columns += [colors.to_numpy(), icons.to_numpy()]
+    return tuple(zip(*columns))
+
+@st.cache_resource
+def get_processor() -> HousingDataProcessor:
+    """Returns the process-wide HousingDataProcessor."""
+    return HousingDataProcessor()
+
+@st.cache_data(ttl=300, max_entries=16)
+def build_map_html(map_records: tuple) -> str:
+    """Builds the map for the given records and returns it as rendered HTML.
+
+    Cached on the marker records only, so reruns that leave the filtered
+    units unchanged (e.g. opening a unit's details) reuse the HTML. Each entry
+    is a full map page, so only the most recent filter combinations are kept.
+    """
+    return get_processor().create_map(map_records).get_root().render()
+
+@st.cache_data(ttl=300, max_entries=4)
+def sidebar_stats(units_version: tuple, _df: pd.DataFrame) -> Dict:
+    """Aggregates shown in the sidebar, keyed on the `units_version` that loaded `_df`."""
+    stats = {'total': len(_df), 'status_counts': {}, 'favorites': None}
+    if 'status' in _df.columns:
+        stats['status_counts'] = _df.groupby('status', observed=True).size().to_dict()
+    if 'favorite' in _df.columns:
+        stats['favorites'] = int((_df['favorite'] == True).sum())
+    return stats
+
+def compute_needs_geocode_mask(df: pd.DataFrame) -> np.ndarray:
+    """
+    Boolean mask of the units that are missing coordinates. Not cached: one
+    vectorized pass over latitude is cheaper than hashing the frame for a key.
+    """
+    if 'latitude' not in df.columns:
+        # If no latitude column, all units need processing
+        return np.ones(len(df), dtype=bool)
+    latitudes = df['latitude']
+    if not pd.api.types.is_numeric_dtype(latitudes):
+        # Only mixed/object columns need the coercing pass; the snapshot stores floats
+        latitudes = pd.to_numeric(latitudes, errors='coerce')
+    return np.isnan(latitudes.to_numpy(dtype='float64', na_value=np.nan))
+
+@st.cache_data(ttl=300, max_entries=4)
+def build_amenity_index(units_version: tuple, _df: pd.DataFrame) -> Dict[str, frozenset]:
+    """
+    Map each amenity display label to the set of row indices that have it.
+    Keyed on the `units_version` that loaded `_df`, like the frame itself.
+    """
+    index = {}
+    if 'amenities' not in _df.columns:
+        return index
+    for row_idx, amenities_data in zip(_df.index, _df['amenities']):
+        if not isinstance(amenities_data, dict):
+            continue
+        for category, amenity_dict in amenities_data.items():
+            if isinstance(amenity_dict, dict):
+                for amenity, has_amenity in amenity_dict.items():
+                    if has_amenity:
+                        amenity_display = f"{category.replace('_', ' ').title()}: {amenity.replace('_', ' ').title()}"
+                        index.setdefault(amenity_display, set()).add(row_idx)
+    return {label: frozenset(rows) for label, rows in index.items()}
+
+def sort_positions(values: pd.Series, ascending: bool) -> np.ndarray:
+    """
+    Row positions that order `values` using an argsort of the values, with
+    missing values last. Not cached: the argsort costs about as much as hashing
+    the column for a cache key would.
+    """
+    missing = values.isna().to_numpy()
+    present = np.flatnonzero(~missing)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        key = values.cat.codes.to_numpy()[present]
+    elif pd.api.types.is_numeric_dtype(values):
+        key = values.to_numpy()[present]
+    else:
+        key = values.iloc[present].astype(str).to_numpy()
+    order = present[np.argsort(key, kind='stable')]
+    if not ascending:
+        order = order[::-1]
+    return np.concatenate([order, np.flatnonzero(missing)])
+
+def sort_units(df: pd.DataFrame, column: str, ascending: bool = True) -> pd.DataFrame:
+    """
+    Reorders rows by a single column. Only the key column is compared; the
+    frame is reordered with one positional take.
+    """
+    if column not in df.columns:
+        return df
+    return df.take(sort_positions(df[column], ascending))
+
+def bump_data_version():
+    """Marks the cached unit data as stale after a write in this session."""
+    st.session_state.data_version = st.session_state.get('data_version', 0) + 1
+
+def _fetch_unit(unit_id: str) -> Optional[Dict]:
+    """Reads a single unit through the service's cache, adding flattened views of its nested fields."""
+    unit_data = fetch_unit(unit_id)
+    if unit_data:
+        unit_data['amenities_flat'] = flatten_amenities(unit_data.get('amenities'))
+        unit_data['owner_paid'], unit_data['tenant_paid'] = split_utilities(unit_data.get('utilities'))
+    return unit_data
 
 def safe_json_loads(s):
     try:
@@ -221,7 +407,7 @@ def safe_json_loads(s):
 def display_unit_details_modal(unit_id: str):
     """Display unit details in a modal-like interface using session state."""
     try:
-        unit_data = firestore_service.get_unit_by_id(unit_id)
+        unit_data = _fetch_unit(unit_id)
         
         if not unit_data:
             st.error(f"No unit found with ID: {unit_id}")
@@ -231,10 +417,8 @@ def display_unit_details_modal(unit_id: str):
         with st.expander(f"📋 **Unit Details: {unit_data.get('property_address', 'N/A')} - Unit {unit_data.get('unit', 'N/A')}**", expanded=True):
             
             # Close button at the top
-            if st.button("❌ Close Details", key=f"close_details_top_{unit_id}", type="secondary"):
-                if 'selected_unit_id' in st.session_state:
-                    del st.session_state.selected_unit_id
-                st.rerun()
+            st.button("❌ Close Details", key=f"close_details_top_{unit_id}", type="secondary",
+                      on_click=close_unit_details)
             
             # Basic info in columns
             col1, col2, col3, col4 = st.columns(4)
@@ -276,7 +460,7 @@ def display_unit_details_modal(unit_id: str):
                 if st.button("💾 Save Status", key=f"save_status_{unit_id}"):
                     firestore_service.update_unit(unit_id, {'status': new_status})
                     st.success(f"Status updated to '{new_status.replace('_', ' ').title()}'!")
-                    st.cache_data.clear()
+                    bump_data_version()
                     st.rerun()
             
             with action_col2:
@@ -286,7 +470,7 @@ def display_unit_details_modal(unit_id: str):
                            key=f"fav_toggle_{unit_id}", use_container_width=True):
                     firestore_service.update_favorite_status(unit_id, not current_favorite)
                     st.success(f"Unit {'removed from' if current_favorite else 'added to'} favorites!")
-                    st.cache_data.clear()
+                    bump_data_version()
                     st.rerun()
             
             with action_col3:
@@ -327,9 +511,7 @@ def display_unit_details_modal(unit_id: str):
                     # Utilities
                     if 'utilities' in unit_data and isinstance(unit_data['utilities'], dict):
                         st.markdown("**🔌 Utilities:**")
-                        utilities_data = unit_data['utilities']
-                        owner_paid = [k for k, v in utilities_data.items() if v == 'owner']
-                        tenant_paid = [k for k, v in utilities_data.items() if v == 'tenant']
+                        owner_paid, tenant_paid = unit_data['owner_paid'], unit_data['tenant_paid']
                         
                         if owner_paid:
                             st.write("**Owner Pays:** " + ", ".join(owner_paid).replace('_', ' ').title())
@@ -340,19 +522,106 @@ def display_unit_details_modal(unit_id: str):
                     # Amenities
                     if 'amenities' in unit_data and isinstance(unit_data['amenities'], dict):
                         st.markdown("**🏠 Amenities:**")
-                        amenities_data = unit_data['amenities']
-                        for category, amenity_dict in amenities_data.items():
-                            if isinstance(amenity_dict, dict):
-                                available = [k for k, v in amenity_dict.items() if v is True]
-                                if available:
-                                    st.write(f"**{category.replace('_', ' ').title()}:**")
-                                    for amenity in available:
-                                        st.write(f"• {amenity.replace('_', ' ').title()}")
+                        for category, labels in groupby(unit_data['amenities_flat'], key=lambda s: s.split(':', 1)[0]):
+                            items = "\n".join(f"• {label.split(':', 1)[1].replace('_', ' ').title()}" for label in labels)
+                            st.write(f"**{category.replace('_', ' ').title()}:**\n\n{items}")
                     
     except Exception as e:
         st.error(f"Error loading unit details: {e}")
 
 # --- Main App ---
+def select_unit(unit_id: str):
+    """Button callback: show details for a unit."""
+    st.session_state.selected_unit_id = unit_id
+
+def close_unit_details():
+    """Button callback: hide the details panel."""
+    st.session_state.pop('selected_unit_id', None)
+
+def set_card_page(page: int):
+    """Button callback: switch the card page."""
+    st.session_state.card_page = page
+
+@st.fragment
+def cards_fragment(filtered_df: pd.DataFrame, is_debug_mode: bool):
+    """Render the unit cards and the selected unit's details.
+
+    Card clicks only rerun this fragment, so the map is not rebuilt.
+    """
+    st.subheader("📋 Unit Cards")
+    
+    # Check if a unit is selected for details view
+    if 'selected_unit_id' in st.session_state:
+        st.info("💡 **Unit details are shown below the cards.** Click 'Close Details' to select another unit.")
+    
+    if is_debug_mode:
+        # Convert complex objects to strings for display only
+        st.dataframe(filtered_df.astype({col: str for col in DICT_COLUMNS if col in filtered_df.columns}))
+    elif len(filtered_df) == 0:
+        st.info("🔍 No units match your current filters. Try adjusting the filters above.")
+    else:
+        # Render one page of cards per run
+        page_count = (len(filtered_df) - 1) // PAGE_SIZE + 1
+        page = min(st.session_state.setdefault('card_page', 0), page_count - 1)
+        page_df = filtered_df.iloc[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+
+        for idx, row in page_df.iterrows():
+            unit_id = row.get('id')
+            is_selected = st.session_state.get('selected_unit_id') == unit_id
+            
+            with st.container(border=True):
+                if is_selected:
+                    st.markdown("🔍 **Selected Unit**")
+                
+                # Display key info in columns
+                info_col1, info_col2, info_col3, action_col = st.columns([3, 2, 2, 1])
+                
+                with info_col1:
+                    st.write(f"**{row.get('property_address', 'N/A')}** - Unit {row.get('unit', 'N/A')}")
+                    st.write(f"📍 {row.get('area', 'N/A')} • {row.get('zip_code', 'N/A')}")
+                
+                with info_col2:
+                    st.write(f"🛏️ {row.get('bedrooms', 'N/A')} BR")
+                    st.write(f"📐 {row.get('square_feet', 'N/A')} sq ft")
+                
+                with info_col3:
+                    status_display = str(row.get('status', 'N/A')).replace('_', ' ').title()
+                    status_color = {
+                        'Available': '🟢',
+                        'Favorite': '⭐',
+                        'Not Interested': '⚪',
+                        'Off Market': '⚫'
+                    }.get(status_display, '🟣')
+                    st.write(f"{status_color} {status_display}")
+                    if row.get('parking'):
+                        st.write(f"🚗 {row.get('parking')} parking")
+                
+                with action_col:
+                    if is_selected:
+                        # Show close button for selected unit
+                        st.button("Close Details", key=f"close_{unit_id}", use_container_width=True,
+                                  on_click=close_unit_details)
+                    else:
+                        # Show view details button
+                        st.button("View Details", key=f"details_{unit_id}", use_container_width=True,
+                                  on_click=select_unit, args=(unit_id,))
+
+        # Page navigation
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            st.button("◀ Prev", key="card_page_prev", disabled=page == 0, use_container_width=True,
+                      on_click=set_card_page, args=(page - 1,))
+        with page_col:
+            st.caption(f"Page {page + 1} of {page_count}")
+        with next_col:
+            st.button("Next ▶", key="card_page_next", disabled=page >= page_count - 1, use_container_width=True,
+                      on_click=set_card_page, args=(page + 1,))
+    
+    # Display unit details below the cards
+    if 'selected_unit_id' in st.session_state:
+        st.divider()
+        display_unit_details_modal(st.session_state.selected_unit_id)
+
 def main_app():
     st.set_page_config(
         page_title="Housing Map", 
@@ -365,7 +634,8 @@ def main_app():
     # --- Debug Mode ---
     is_debug_mode = st.query_params.get("debug", "false").lower() == "true"
 
-    all_db_units = get_all_units_cached()
+    all_db_units = load_units_df()
+    units_version = st.session_state.units_version
 
     if all_db_units.empty:
         st.info("Welcome! Your database is currently empty.")
@@ -385,23 +655,19 @@ def main_app():
         st.header("🛠️ Data Management")
 
         if st.button("🔄 Process New/Uncoded Units", use_container_width=True):
-            st.cache_data.clear() # Clear cache before processing
+            bump_data_version() # Re-read the units before processing
             with st.spinner("Checking for units to process..."):
-                all_data = get_all_units_cached()
+                all_data = load_units_df()
             
             # Check if any units need processing (geocoding)
-            if 'latitude' not in all_data.columns:
-                needs_processing = len(all_data) > 0  # Need processing if we have data but no latitude column
-            else:
-                needs_processing = pd.to_numeric(all_data['latitude'], errors='coerce').isnull().any()
+            needs_processing = compute_needs_geocode_mask(all_data).any()
             
             if not needs_processing:
                 st.toast("No new units to process.")
             else:
                 progress_bar = st.progress(0, "Starting processing...")
                 status_text = st.empty()
-                processor = HousingDataProcessor()
-                results = processor.process_all_units(all_data, status_text, progress_bar)
+                results = get_processor().process_all_units(all_data, status_text, progress_bar)
                 
                 st.success("Processing complete!")
                 st.metric("Processed/Geocoded", results['processed'] + results['processed_no_scrape'])
@@ -410,7 +676,7 @@ def main_app():
                 
                 progress_bar.empty()
                 status_text.empty()
-                st.cache_data.clear() # Clear cache again to show new data
+                bump_data_version() # Show the newly processed data
                 st.rerun()
 
 
@@ -437,18 +703,16 @@ def main_app():
         """)
         
         st.header("📈 Data Overview")
-        st.write(f"Total units in database: **{len(df)}**")
+        stats = sidebar_stats(units_version, df)
+        st.write(f"Total units in database: **{stats['total']}**")
         
         # Quick stats
-        if 'status' in df.columns:
-            status_counts = df['status'].value_counts()
-            for status, count in status_counts.items():
-                st.write(f"• {status.replace('_', ' ').title()}: {count}")
+        for status, count in stats['status_counts'].items():
+            st.write(f"• {status.replace('_', ' ').title()}: {count}")
         
         # Show favorites count
-        if 'favorite' in df.columns:
-            favorites_count = df['favorite'].sum() if df['favorite'].dtype == bool else len(df[df['favorite'] == True])
-            st.write(f"• ⭐ Favorited: {favorites_count}")
+        if stats['favorites'] is not None:
+            st.write(f"• ⭐ Favorited: {stats['favorites']}")
                 
         st.header("🔗 Quick Links")
         st.page_link("pages/1_Upload_Data.py", label="📁 Upload New Data", icon="📁")
@@ -477,14 +741,15 @@ def main_app():
                         st.success("Database cleared successfully!")
                     else:
                         st.error("Failed to clear database.")
-                    st.cache_data.clear()
+                    bump_data_version()
                     st.rerun()
                     
                 st.subheader("Data Debug Info")
                 st.write(f"DataFrame shape: {df.shape}")
                 st.write(f"Available columns: {list(df.columns)}")
                 if 'area' in df.columns:
-                    st.write(f"Area column info: min={df['area'].min()}, max={df['area'].max()}, non-null count={df['area'].count()}")
+                    area_values = df['area'].dropna().astype(str)
+                    st.write(f"Area column info: min={area_values.min()}, max={area_values.max()}, non-null count={df['area'].count()}")
                     st.write(f"Area sample values: {df['area'].dropna().head().tolist()}")
                 if 'bedrooms' in df.columns:
                     st.write(f"Bedrooms column info: unique values={sorted(df['bedrooms'].dropna().unique().tolist())}")
@@ -499,16 +764,18 @@ def main_app():
     base_df = df.copy()
     
     # Clean data types for display to prevent Arrow conversion issues
-    for col in base_df.columns:
-        if col in ['bedrooms', 'parking', 'zip_code', 'square_feet']:
-            # Ensure numeric columns are properly typed
-            base_df[col] = pd.to_numeric(base_df[col], errors='coerce').fillna(0).astype(int)
-        elif col in ['bathrooms']:
-            # Bathrooms can be float
-            base_df[col] = pd.to_numeric(base_df[col], errors='coerce').fillna(0.0)
-        elif col in ['amenities', 'utilities', 'subsidy']:
-            # Convert complex objects to strings for display
-            base_df[col] = base_df[col].astype(str)
+    int_cols = [col for col in ['bedrooms', 'parking', 'zip_code', 'square_feet'] if col in base_df.columns]
+    if int_cols:
+        # Ensure numeric columns are properly typed, in one pass
+        base_df[int_cols] = base_df[int_cols].apply(pd.to_numeric, errors='coerce').fillna(0).astype('int32')
+    # Downcast the small-valued columns
+    base_df = base_df.astype({col: 'int8' for col in ['bedrooms', 'parking'] if col in base_df.columns})
+    if 'zip_code' in base_df.columns:
+        # Restore the categorical after numeric coercion
+        base_df['zip_code'] = base_df['zip_code'].astype('category')
+    if 'bathrooms' in base_df.columns:
+        # Bathrooms can be float
+        base_df['bathrooms'] = pd.to_numeric(base_df['bathrooms'], errors='coerce').fillna(0.0).astype('float32')
     
     # Add filters and sorting in the main content area
     st.subheader("📋 Housing Units")
@@ -527,7 +794,7 @@ def main_app():
     with filter_col2:
         # Status filter - now includes favorites
         if 'status' in base_df.columns:
-            status_options = sorted(base_df['status'].dropna().unique().tolist())
+            status_options = base_df['status'].cat.categories.tolist()
             # Add favorites option
             if 'favorite' in base_df.columns:
                 status_options.append('favorites')
@@ -538,7 +805,7 @@ def main_app():
     with filter_col3:
         # Area/Neighborhood multi-select
         if 'area' in base_df.columns:
-            area_options = sorted(base_df['area'].dropna().unique().tolist())
+            area_options = base_df['area'].cat.categories.tolist()
             selected_areas = st.multiselect("📍 Neighborhoods", area_options, key="area_filter")
         else:
             selected_areas = []
@@ -546,7 +813,7 @@ def main_app():
     with filter_col4:
         # Zip code multi-select
         if 'zip_code' in base_df.columns:
-            zip_options = sorted([int(x) for x in base_df['zip_code'].dropna().unique() if x > 0])
+            zip_options = [int(x) for x in base_df['zip_code'].cat.categories if x > 0]
             selected_zips = st.multiselect("📮 Zip Codes", zip_options, key="zip_filter")
         else:
             selected_zips = []
@@ -555,26 +822,14 @@ def main_app():
     amenity_col, sort_col, clear_col = st.columns([4, 2, 2])
     
     with amenity_col:
-        # Amenities filter
-        amenity_options = []
-        if 'amenities' in base_df.columns:
-            # Extract all unique amenities from the data
-            for _, row in base_df.iterrows():
-                if isinstance(row.get('amenities'), dict):
-                    for category, amenity_dict in row['amenities'].items():
-                        if isinstance(amenity_dict, dict):
-                            for amenity, has_amenity in amenity_dict.items():
-                                if has_amenity:
-                                    amenity_display = f"{category.replace('_', ' ').title()}: {amenity.replace('_', ' ').title()}"
-                                    if amenity_display not in amenity_options:
-                                        amenity_options.append(amenity_display)
-            amenity_options = sorted(amenity_options)
+        # Amenities filter (indexed from the raw amenity dicts, before display stringification)
+        amenity_index = build_amenity_index(units_version, df)
+        amenity_options = sorted(amenity_index)
         selected_amenities = st.multiselect("🏠 Amenities", amenity_options, key="amenity_filter")
     
     with sort_col:
         # Sort options
-        sort_options = ['Address', 'Bedrooms', 'Square Feet', 'Status', 'Area']
-        selected_sort = st.selectbox("📈 Sort by", sort_options, key="sort_filter")
+        selected_sort = st.selectbox("📈 Sort by", list(_SORT_COLS), key="sort_filter")
     
     with clear_col:
         if st.button("🗑️ Clear All Filters", use_container_width=True):
@@ -584,8 +839,8 @@ def main_app():
                     del st.session_state[key]
             st.rerun()
     
-    # Apply filters
-    filtered_df = base_df.copy()
+    # Sort the full set first; the filters below keep this order
+    filtered_df = sort_units(base_df, *_SORT_COLS[selected_sort])
     
     # Apply bedroom filter
     if selected_bedrooms:
@@ -615,35 +870,8 @@ def main_app():
     
     # Apply amenities filter
     if selected_amenities:
-        def has_selected_amenities(row):
-            if not isinstance(row.get('amenities'), dict):
-                return False
-            for selected_amenity in selected_amenities:
-                if ':' in selected_amenity:
-                    category_part, amenity_part = selected_amenity.split(':', 1)
-                    category = category_part.strip().lower().replace(' ', '_')
-                    amenity = amenity_part.strip().lower().replace(' ', '_')
-                    
-                    amenities_data = row['amenities']
-                    if category in amenities_data and isinstance(amenities_data[category], dict):
-                        if amenity in amenities_data[category] and amenities_data[category][amenity]:
-                            continue
-                    return False
-            return True
-        
-        filtered_df = filtered_df[filtered_df.apply(has_selected_amenities, axis=1)]
-    
-    # Apply sorting
-    if selected_sort == 'Address':
-        filtered_df = filtered_df.sort_values('property_address', na_position='last')
-    elif selected_sort == 'Bedrooms':
-        filtered_df = filtered_df.sort_values('bedrooms', na_position='last')
-    elif selected_sort == 'Square Feet':
-        filtered_df = filtered_df.sort_values('square_feet', ascending=False, na_position='last')
-    elif selected_sort == 'Status':
-        filtered_df = filtered_df.sort_values('status', na_position='last')
-    elif selected_sort == 'Area':
-        filtered_df = filtered_df.sort_values('area', na_position='last')
+        keep = reduce(frozenset.intersection, [amenity_index.get(a, frozenset()) for a in selected_amenities])
+        filtered_df = filtered_df[filtered_df.index.isin(keep)]
     
     # Display count
     st.write(f"**Showing {len(filtered_df)} of {len(base_df)} units**")
@@ -653,75 +881,12 @@ def main_app():
 
     with map_col:
         st.subheader("🗺️ Map View")
-        processor = HousingDataProcessor()
-        m = processor.create_map(filtered_df)  # Use filtered data for map
-        st_folium(m, width='100%', height=600, returned_objects=[])
+        map_html = build_map_html(get_map_records(filtered_df))  # Use filtered data for map
+        components.html(map_html, height=600)
 
     with data_col:
-        st.subheader("📋 Unit Cards")
-        
-        # Check if a unit is selected for details view
-        if 'selected_unit_id' in st.session_state:
-            st.info("💡 **Unit details are shown below the cards.** Click 'Close Details' to select another unit.")
-        
-        if is_debug_mode:
-            st.dataframe(filtered_df)
-        else:
-            # Display units as cards
-            if len(filtered_df) == 0:
-                st.info("🔍 No units match your current filters. Try adjusting the filters above.")
-            else:
-                for idx, row in filtered_df.iterrows():
-                    unit_id = row.get('id')
-                    is_selected = st.session_state.get('selected_unit_id') == unit_id
-                    
-                    # Use different border style for selected card
-                    border_color = "blue" if is_selected else None
-                    
-                    with st.container(border=True):
-                        if is_selected:
-                            st.markdown("🔍 **Selected Unit**")
-                        
-                        # Display key info in columns
-                        info_col1, info_col2, info_col3, action_col = st.columns([3, 2, 2, 1])
-                        
-                        with info_col1:
-                            st.write(f"**{row.get('property_address', 'N/A')}** - Unit {row.get('unit', 'N/A')}")
-                            st.write(f"📍 {row.get('area', 'N/A')} • {row.get('zip_code', 'N/A')}")
-                        
-                        with info_col2:
-                            st.write(f"🛏️ {row.get('bedrooms', 'N/A')} BR")
-                            st.write(f"📐 {row.get('square_feet', 'N/A')} sq ft")
-                        
-                        with info_col3:
-                            status_display = str(row.get('status', 'N/A')).replace('_', ' ').title()
-                            status_color = {
-                                'Available': '🟢',
-                                'Favorite': '⭐',
-                                'Not Interested': '⚪',
-                                'Off Market': '⚫'
-                            }.get(status_display, '🟣')
-                            st.write(f"{status_color} {status_display}")
-                            if row.get('parking'):
-                                st.write(f"🚗 {row.get('parking')} parking")
-                        
-                        with action_col:
-                            if is_selected:
-                                # Show close button for selected unit
-                                if st.button("Close Details", key=f"close_{unit_id}", use_container_width=True):
-                                    if 'selected_unit_id' in st.session_state:
-                                        del st.session_state.selected_unit_id
-                                    st.rerun()
-                            else:
-                                # Show view details button
-                                if st.button("View Details", key=f"details_{unit_id}", use_container_width=True):
-                                    st.session_state.selected_unit_id = unit_id
-                                    st.rerun()
-    
-    # Display unit details OUTSIDE the columns, below everything
-    if 'selected_unit_id' in st.session_state:
-        st.divider()
-        display_unit_details_modal(st.session_state.selected_unit_id)
+        # Cards and details rerun on their own; the map above is left untouched
+        cards_fragment(filtered_df, is_debug_mode)
 
 if __name__ == "__main__":
     main_app()
@@ -2,9 +2,122 @@ import streamlit as st
 import google.auth
 from google.cloud import firestore
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from datetime import datetime
+import os
 import re
-from typing import Dict, Any, Optional
+import time
+import json
+import hashlib
+from typing import Dict, Any, Optional, List, Tuple
+
+# Local Parquet snapshot of the units collection, read by the map and list views
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'units_snapshot.parquet')
+# Age after which the snapshot is rebuilt, so edits made outside this app show up
+SNAPSHOT_TTL_SECONDS = 30 * 60
+
+# Columns needed to render the map, filters and unit cards
+DISPLAY_COLUMNS = [
+    'id', 'property_address', 'unit', 'zip_code', 'area', 'bedrooms', 'bathrooms',
+    'square_feet', 'parking', 'status', 'favorite', 'latitude', 'longitude',
+    'amenities', 'listing_link'
+]
+
+# Fields rendered by the unit cards; full documents are only fetched for the details view
+_CARD_FIELDS = ('id', 'property_address', 'unit', 'area', 'zip_code', 'bedrooms', 'square_feet', 'status', 'parking')
+
+# Favorite units fetched per page (ordered by last_seen_date, see firestore.indexes.json)
+FAVORITES_PAGE_SIZE = 50
+
+# The Favorites page also shows details from its rows; reads are billed per document, not per field
+_FAVORITE_FIELDS = _CARD_FIELDS + (
+    'last_seen_date', 'favorite', 'bathrooms', 'rent', 'listing_link',
+    'subsidy', 'amenities', 'notes', 'questions_for_agent'
+)
+
+# Standard amenity categories and options
+AMENITY_CATEGORIES = {
+    'community': [
+        'clubhouse', 'fitness_center', 'gym', 'pool', 'spa', 'hot_tub', 'sauna',
+        'business_center', 'conference_room', 'rooftop_deck', 'courtyard',
+        'playground', 'dog_park', 'barbecue_area', 'fire_pit', 'game_room',
+        'theater_room', 'library', 'concierge', 'doorman', 'security'
+    ],
+    'indoor': [
+        'air_conditioning', 'heating', 'hardwood_floors', 'carpet', 'tile_floors',
+        'walk_in_closet', 'ceiling_fans', 'fireplace', 'balcony', 'patio',
+        'bay_windows', 'high_ceilings', 'loft', 'den', 'office_space'
+    ],
+    'kitchen': [
+        'dishwasher', 'garbage_disposal', 'microwave', 'refrigerator', 'stove',
+        'oven', 'granite_counters', 'stainless_steel_appliances', 'island',
+        'breakfast_bar', 'pantry', 'wine_fridge'
+    ],
+    'other': [
+        'parking_garage', 'covered_parking', 'laundry_in_unit', 'laundry_on_site',
+        'elevator', 'wheelchair_accessible', 'storage_unit', 'bike_storage'
+    ]
+}
+
+# Standard utilities
+UTILITIES = ['electricity', 'gas', 'water', 'sewer', 'trash', 'internet', 'cable']
+
+# Precompiled patterns shared by the ID sanitizer and the data cleaners
+_NON_WORD_RE = re.compile(r'[^\w]+')
+_NUM_RE = re.compile(r'\d+\.?\d*')
+_INT_RE = re.compile(r'\d+')
+_SQFT_RE = re.compile(r'(sq\.?\s?ft\.?|square\s?feet|\s)', re.IGNORECASE)
+_MONEY_RE = re.compile(r'[\$,\s]')
+_NO_PARKING_RE = re.compile(r'no parking|none|n/a|not available')
+_BC_RE = re.compile(r'bc|housing choice')
+_OWNER_PAYS_RE = re.compile(r'included|owner|landlord|paid')
+
+# One pattern per amenity matching any of its spellings ("hot_tub", "hot tub", "hot-tub")
+AMENITY_PATTERNS = {
+    amenity: re.compile('|'.join(
+        re.escape(v) for v in dict.fromkeys([amenity, amenity.replace('_', ' '), amenity.replace('_', '-')])
+    ))
+    for amenity_list in AMENITY_CATEGORIES.values() for amenity in amenity_list
+}
+
+# (category, amenity) for each AMENITY_PATTERNS entry, in the same order
+_AMENITY_SLOTS = [(category, amenity) for category, amenity_list in AMENITY_CATEGORIES.items() for amenity in amenity_list]
+
+# All-False amenity flags; rows copy it and set only the amenities they mention
+_EMPTY_AMENITIES_TEMPLATE = {category: dict.fromkeys(amenity_list, False) for category, amenity_list in AMENITY_CATEGORIES.items()}
+
+def flatten_amenities(amenities: Any) -> List[str]:
+    """Flattens a nested amenities dict into sorted "category:amenity" labels."""
+    if not isinstance(amenities, dict):
+        return []
+    return sorted(
+        f"{cat}:{k}" for cat, d in amenities.items() if isinstance(d, dict)
+        for k, v in d.items() if v is True
+    )
+
+def split_utilities(utilities: Any) -> Tuple[List[str], List[str]]:
+    """Splits a utilities dict into (owner_paid, tenant_paid) lists."""
+    if not isinstance(utilities, dict):
+        return [], []
+    owner_paid = [k for k, v in utilities.items() if v == 'owner']
+    tenant_paid = [k for k, v in utilities.items() if v == 'tenant']
+    return owner_paid, tenant_paid
+
+@st.cache_resource(show_spinner=False)
+def _get_client() -> firestore.Client:
+    """
+    Builds the Firestore client once per server process; the cache outlives module
+    reloads, so every page and session shares one client and its connection pool.
+    """
+    try:
+        gcp_service_account = st.secrets["gcp_service_account"]
+        credentials = google.oauth2.service_account.Credentials.from_service_account_info(gcp_service_account)
+        return firestore.Client(credentials=credentials)
+    except (FileNotFoundError, KeyError):
+        # Fallback for local dev without Streamlit secrets
+        return firestore.Client()
 
 class FirestoreService:
     """
@@ -23,21 +136,16 @@ class FirestoreService:
             self.db = self._initialize_client()
 
     def _initialize_client(self) -> firestore.Client:
-        """Initializes and returns a Firestore client."""
-        try:
-            gcp_service_account = st.secrets["gcp_service_account"]
-            credentials = google.oauth2.service_account.Credentials.from_service_account_info(gcp_service_account)
-            return firestore.Client(credentials=credentials)
-        except (FileNotFoundError, KeyError):
-            # Fallback for local dev without Streamlit secrets
-            return firestore.Client()
+        """Returns the shared Firestore client."""
+        return _get_client()
 
     @staticmethod
     def _sanitize_unit_id(address: str, unit_number: str, zip_code: str) -> str:
         """Creates a URL-safe and Firestore-safe document ID."""
-        raw_id = f"{address}_{unit_number}_{zip_code}".lower().replace(' ', '-')
-        sanitized = re.sub(r'[^\w\-_]', '', raw_id)
-        sanitized = re.sub(r'--+', '-', sanitized).strip('-')
+        # One pass over runs of non-word characters: a run holding a space or dash
+        # becomes a single '-', any other run (punctuation) is dropped
+        raw_id = f"{address}_{unit_number}_{zip_code}".lower()
+        sanitized = _NON_WORD_RE.sub(lambda m: '-' if ' ' in m[0] or '-' in m[0] else '', raw_id).strip('-')
         # Ensure we have a valid ID, fallback to timestamp if empty
         if not sanitized or len(sanitized) < 3:
             sanitized = f"unit_{datetime.now().strftime('%Y%m%d%H%M%S')}"
@@ -50,33 +158,6 @@ class FirestoreService:
         """
         cleaned_data = {}
         
-        # Define standard amenity categories and options
-        AMENITY_CATEGORIES = {
-            'community': [
-                'clubhouse', 'fitness_center', 'gym', 'pool', 'spa', 'hot_tub', 'sauna',
-                'business_center', 'conference_room', 'rooftop_deck', 'courtyard',
-                'playground', 'dog_park', 'barbecue_area', 'fire_pit', 'game_room',
-                'theater_room', 'library', 'concierge', 'doorman', 'security'
-            ],
-            'indoor': [
-                'air_conditioning', 'heating', 'hardwood_floors', 'carpet', 'tile_floors',
-                'walk_in_closet', 'ceiling_fans', 'fireplace', 'balcony', 'patio',
-                'bay_windows', 'high_ceilings', 'loft', 'den', 'office_space'
-            ],
-            'kitchen': [
-                'dishwasher', 'garbage_disposal', 'microwave', 'refrigerator', 'stove',
-                'oven', 'granite_counters', 'stainless_steel_appliances', 'island',
-                'breakfast_bar', 'pantry', 'wine_fridge'
-            ],
-            'other': [
-                'parking_garage', 'covered_parking', 'laundry_in_unit', 'laundry_on_site',
-                'elevator', 'wheelchair_accessible', 'storage_unit', 'bike_storage'
-            ]
-        }
-        
-        # Define standard utilities
-        UTILITIES = ['electricity', 'gas', 'water', 'sewer', 'trash', 'internet', 'cable']
-        
         for key, value in row_data.items():
             if pd.isna(value) or value == '' or value is None:
                 continue
@@ -90,11 +171,11 @@ class FirestoreService:
                     if isinstance(value, str):
                         if 'studio' in value.lower():
                             cleaned_data[clean_key] = 0 if clean_key == 'bedrooms' else value
-                        elif clean_key in ['parking', 'parking_spots'] and any(word in value.lower() for word in ['no parking', 'none', 'n/a', 'not available']):
+                        elif clean_key in ['parking', 'parking_spots'] and _NO_PARKING_RE.search(value.lower()):
                             # Handle "No Parking" cases
                             cleaned_data[clean_key] = 0
                         else:
-                            numbers = re.findall(r'\d+\.?\d*', str(value))
+                            numbers = _NUM_RE.findall(str(value))
                             if numbers:
                                 if clean_key in ['bedrooms', 'parking', 'parking_spots']:
                                     cleaned_data[clean_key] = int(float(numbers[0]))
@@ -112,8 +193,7 @@ class FirestoreService:
                 elif clean_key in ['square_feet', 'sqft', 'sq_ft', 'size']:
                     # Parse square footage as integer
                     if isinstance(value, str):
-                        cleaned_value = re.sub(r'(sq\.?\s?ft\.?|square\s?feet|\s)', '', str(value), flags=re.IGNORECASE)
-                        numbers = re.findall(r'\d+', cleaned_value)
+                        numbers = _INT_RE.findall(_SQFT_RE.sub('', str(value)))
                         if numbers:
                             cleaned_data['square_feet'] = int(numbers[0])
                     else:
@@ -126,8 +206,7 @@ class FirestoreService:
                 elif clean_key in ['rent', 'price', 'monthly_rent', 'cost']:
                     # Parse rent as integer
                     if isinstance(value, str):
-                        cleaned_value = re.sub(r'[\$,\s]', '', str(value))
-                        numbers = re.findall(r'\d+', cleaned_value)
+                        numbers = _INT_RE.findall(_MONEY_RE.sub('', str(value)))
                         if numbers:
                             cleaned_data[clean_key] = int(numbers[0])
                     else:
@@ -147,7 +226,7 @@ class FirestoreService:
                     value_str = str(value).lower()
                     if 'hacla' in value_str:
                         subsidy_data['hacla'] = True
-                    if 'bc' in value_str or 'housing choice' in value_str:
+                    if _BC_RE.search(value_str):
                         subsidy_data['bc'] = True
                     cleaned_data['subsidy'] = subsidy_data
                     
@@ -160,47 +239,21 @@ class FirestoreService:
                         
                 elif clean_key in ['amenities', 'amenity']:
                     # Parse amenities into structured boolean flags
-                    amenities_data = {}
-                    for category, amenity_list in AMENITY_CATEGORIES.items():
-                        amenities_data[category] = {}
-                        for amenity in amenity_list:
-                            amenities_data[category][amenity] = False
-                    
-                    # Check which amenities are present
                     value_str = str(value).lower()
-                    for category, amenity_list in AMENITY_CATEGORIES.items():
-                        for amenity in amenity_list:
-                            # Check various forms of the amenity name
-                            amenity_variations = [
-                                amenity,
-                                amenity.replace('_', ' '),
-                                amenity.replace('_', '-'),
-                            ]
-                            for variation in amenity_variations:
-                                if variation in value_str:
-                                    amenities_data[category][amenity] = True
-                                    break
-                    
+                    amenities_data = {category: flags.copy() for category, flags in _EMPTY_AMENITIES_TEMPLATE.items()}
+                    for (category, amenity), pattern in zip(_AMENITY_SLOTS, AMENITY_PATTERNS.values()):
+                        if pattern.search(value_str):
+                            amenities_data[category][amenity] = True
                     cleaned_data['amenities'] = amenities_data
                     
                 elif clean_key in ['utilities', 'utility']:
                     # Parse utilities as owner/tenant structure
-                    utilities_data = {}
-                    for utility in UTILITIES:
-                        utilities_data[utility] = 'unknown'  # default
-                    
                     value_str = str(value).lower()
-                    for utility in UTILITIES:
-                        if utility in value_str:
-                            # Try to determine if owner or tenant pays
-                            if any(word in value_str for word in ['included', 'owner', 'landlord', 'paid']):
-                                utilities_data[utility] = 'owner'
-                            elif any(word in value_str for word in ['tenant', 'renter', 'separate']):
-                                utilities_data[utility] = 'tenant'
-                            else:
-                                utilities_data[utility] = 'tenant'  # default assumption
-                    
-                    cleaned_data['utilities'] = utilities_data
+                    # Owner pays when the text says so; otherwise assume the tenant does
+                    payer = 'owner' if _OWNER_PAYS_RE.search(value_str) else 'tenant'
+                    cleaned_data['utilities'] = {
+                        utility: payer if utility in value_str else 'unknown' for utility in UTILITIES
+                    }
                     
                 elif clean_key in ['latitude', 'lat', 'longitude', 'lng', 'lon']:
                     # Parse coordinates as floats
@@ -220,6 +273,127 @@ class FirestoreService:
                 
         return cleaned_data
 
+    @staticmethod
+    def _schema_hash(data: Dict[str, Any]) -> str:
+        """
+        Short digest of the canonical (key-sorted) JSON form of a unit. Always the
+        stdlib serializer, so stored hashes stay comparable across installs.
+        """
+        payload = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str).encode()
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    @staticmethod
+    def _parse_and_clean_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Column-wise version of _parse_and_clean_data for whole uploads. Returns one
+        object column per cleaned field, holding None where a row has no value.
+        """
+        cleaned = {}
+        for key in df.columns:
+            clean_key = str(key).lower().replace(' ', '_')
+            if clean_key == 'flexible_data':  # Skip flexible_data field
+                continue
+
+            col = df[key]
+            present = col.notna() & (col != '')
+            # Blank out missing cells first: an all-empty CSV column arrives as float NaN,
+            # which would leave the .str accessors below without any strings to work on
+            text = col.where(present, '').astype(str)
+            lower = text.str.lower()
+            target = clean_key
+
+            if clean_key in ['bedrooms', 'bathrooms', 'parking', 'parking_spots']:
+                number = text.str.extract(f'({_NUM_RE.pattern})', expand=False).astype(float)
+                if clean_key == 'bathrooms':
+                    values = number.astype(object)
+                else:
+                    values = np.trunc(number).astype('Int64').astype(object)
+                if clean_key in ['parking', 'parking_spots']:
+                    # "No Parking" and unparseable parking become 0
+                    no_parking = lower.str.contains(_NO_PARKING_RE)
+                    values = values.where(number.notna() & ~no_parking, 0)
+                else:
+                    values = values.where(number.notna(), text)
+                studio = lower.str.contains('studio', regex=False)
+                values = values.where(~studio, 0 if clean_key == 'bedrooms' else text)
+
+            elif clean_key in ['square_feet', 'sqft', 'sq_ft', 'size']:
+                # Parse square footage as integer
+                digits = text.str.replace(_SQFT_RE, '', regex=True)
+                values = pd.to_numeric(digits.str.extract(f'({_INT_RE.pattern})', expand=False)).astype('Int64').astype(object)
+                target = 'square_feet'
+
+            elif clean_key in ['area', 'neighborhood', 'location']:
+                # Keep area as string (neighborhood name)
+                values = text.str.strip()
+                target = 'area'
+
+            elif clean_key in ['rent', 'price', 'monthly_rent', 'cost']:
+                # Parse rent as integer
+                digits = text.str.replace(_MONEY_RE, '', regex=True)
+                values = pd.to_numeric(digits.str.extract(f'({_INT_RE.pattern})', expand=False)).astype('Int64').astype(object)
+
+            elif clean_key in ['zip_code', 'zipcode', 'postal_code']:
+                # ZIP code as integer
+                zip_str = text.str.strip().str.split('-').str[0]
+                values = pd.to_numeric(zip_str.where(zip_str.str.fullmatch(r'\d{5}'))).astype('Int64').astype(object)
+                target = 'zip_code'
+
+            elif clean_key in ['subsidy_accepted', 'subsidies', 'subsidy']:
+                # Parse subsidy flags
+                hacla = lower.str.contains('hacla', regex=False).tolist()
+                bc = lower.str.contains(_BC_RE).tolist()
+                values = pd.Series([{'hacla': h, 'bc': b} for h, b in zip(hacla, bc)], index=df.index, dtype=object)
+                target = 'subsidy'
+
+            elif clean_key in ['available', 'availability']:
+                # Parse availability as boolean
+                is_str = col.map(lambda v: isinstance(v, str))
+                truthy = lower.isin(['true', 'yes', '1', 'y', 'available', 'vacant'])
+                values = truthy.where(is_str, col.astype(bool)).astype(object)
+                target = 'available'
+
+            elif clean_key in ['amenities', 'amenity']:
+                # Parse amenities into structured boolean flags, one vectorized match per amenity
+                hits = np.column_stack([lower.str.contains(pattern).to_numpy() for pattern in AMENITY_PATTERNS.values()])
+                amenity_rows = []
+                for row_hits in hits:
+                    amenities_data = {category: flags.copy() for category, flags in _EMPTY_AMENITIES_TEMPLATE.items()}
+                    for slot in np.flatnonzero(row_hits):
+                        category, amenity = _AMENITY_SLOTS[slot]
+                        amenities_data[category][amenity] = True
+                    amenity_rows.append(amenities_data)
+                values = pd.Series(amenity_rows, index=df.index, dtype=object)
+                target = 'amenities'
+
+            elif clean_key in ['utilities', 'utility']:
+                # Parse utilities as owner/tenant structure (tenant pays unless stated otherwise)
+                payer = np.where(lower.str.contains(_OWNER_PAYS_RE), 'owner', 'tenant').tolist()
+                mentioned = zip(*[lower.str.contains(utility, regex=False).tolist() for utility in UTILITIES])
+                values = pd.Series([
+                    {utility: who if hit else 'unknown' for utility, hit in zip(UTILITIES, hits)}
+                    for who, hits in zip(payer, mentioned)
+                ], index=df.index, dtype=object)
+                target = 'utilities'
+
+            elif clean_key in ['latitude', 'lat', 'longitude', 'lng', 'lon']:
+                # Parse coordinates as floats, keeping unparseable values as strings
+                number = pd.to_numeric(col, errors='coerce')
+                values = number.astype(object).where(number.notna(), text)
+
+            else:
+                # Default: keep as string but clean it
+                values = text.str.strip()
+
+            values = values.astype(object).where(present & values.notna(), None)
+            # Later columns mapping to the same field win where they produced a value
+            cleaned[target] = values.where(values.notna(), cleaned[target]) if target in cleaned else values
+
+        cleaned_df = pd.DataFrame(cleaned, index=df.index)
+        # Always add favorite field as false for new records
+        cleaned_df['favorite'] = False
+        return cleaned_df
+
     def upload_from_dataframe(self, df: pd.DataFrame) -> tuple[int, int]:
         """
         Loads data from a pandas DataFrame into Firestore, updating existing
@@ -228,44 +402,48 @@ class FirestoreService:
         units_collection = self.db.collection('units')
         batch_id = f"batch_{datetime.now().strftime('%Y%m%d%H%M%S')}"
         
-        insert_count = 0
-        update_count = 0
-
         # Normalize column names for flexibility
         df.columns = [c.lower().replace(' ', '_') for c in df.columns]
 
-        for _, row in df.iterrows():
-            try:
-                address = row.get('property_address', '').strip()
-                unit_num = str(row.get('unit', '')).strip()
-                zip_code = str(row.get('zip_code', '')).strip()
+        # Clean all rows in column-wise passes, then keep rows with an address and zip
+        cleaned_df = self._parse_and_clean_dataframe(df)
+        records = [{k: v for k, v in rec.items() if v is not None} for rec in cleaned_df.to_dict('records')]
+        blank = pd.Series('', index=df.index)
+        addresses = df.get('property_address', blank).fillna('').astype(str).str.strip()
+        unit_nums = df.get('unit', blank).astype(str).str.strip()
+        zip_codes = df.get('zip_code', blank).astype(str).str.strip()
+        # Repeated rows for the same unit collapse into one write, later values winning
+        rows = {}
+        for address, unit_num, zip_code, unit_data in zip(addresses, unit_nums, zip_codes, records):
+            if address and zip_code:
+                rows.setdefault(self._sanitize_unit_id(address, unit_num, zip_code), {}).update(unit_data)
+        rows = list(rows.items())
 
-                if not address or not zip_code:
-                    continue
-                
-                doc_id = self._sanitize_unit_id(address, unit_num, zip_code)
-                unit_ref = units_collection.document(doc_id)
-                
-                # Use the new parsing method to clean and convert data types
-                unit_data = self._parse_and_clean_data(row.to_dict())
-                
-                doc = unit_ref.get()
-                if doc.exists:
-                    update_data = unit_data.copy()
-                    update_data['last_seen_date'] = datetime.now().isoformat()
-                    update_data['status'] = 'available'
+        failed = []
+        writer = self._bulk_writer(failed)
+        inserted, updated = [], []
+        for start in range(0, len(rows), 500):
+            chunk = rows[start:start + 500]
+            # One round trip to learn which units already exist (and their favorite flag)
+            refs = [units_collection.document(doc_id) for doc_id, _ in chunk]
+            existing = self.get_units_by_ids([doc_id for doc_id, _ in chunk])
+            now = datetime.now().isoformat()
+
+            # unit_data dicts are built per upload and not reused, so they are filled in place
+            for ref, (doc_id, unit_data) in zip(refs, chunk):
+                if doc_id in existing:
+                    unit_data['last_seen_date'] = now
+                    unit_data['status'] = 'available'
                     # Preserve existing favorite status if it exists
-                    existing_data = doc.to_dict()
-                    if 'favorite' in existing_data:
-                        update_data['favorite'] = existing_data['favorite']
-                    unit_ref.update(update_data)
-                    update_count += 1
+                    if 'favorite' in existing[doc_id]:
+                        unit_data['favorite'] = existing[doc_id]['favorite']
+                    writer.update(ref, unit_data)
+                    updated.append(doc_id)
                 else:
-                    new_data = unit_data.copy()
-                    new_data.update({
+                    unit_data.update({
                         'id': doc_id,
-                        'first_seen_date': datetime.now().isoformat(),
-                        'last_seen_date': datetime.now().isoformat(),
+                        'first_seen_date': now,
+                        'last_seen_date': now,
                         'status': 'available',
                         'batch_id': batch_id
                     })
@@ -273,29 +451,110 @@ class FirestoreService:
                     for field in ['level_of_interest', 'viewing_scheduled', 
                                   'availability_verified_date', 'amenities', 
                                   'questions_for_agent', 'notes']:
-                        if field not in new_data:
-                            new_data[field] = ''
-                    unit_ref.set(new_data)
-                    insert_count += 1
-            except Exception as e:
-                # Log the error but continue processing other rows
-                print(f"Error processing row: {e}")
-                continue
+                        if field not in unit_data:
+                            unit_data[field] = ''
+                    writer.set(ref, unit_data)
+                    inserted.append(doc_id)
+
+        # Wait for all pooled writes to finish
+        writer.close()
+        failed = set(failed)
+        insert_count = sum(doc_id not in failed for doc_id in inserted)
+        update_count = sum(doc_id not in failed for doc_id in updated)
                 
+        self._invalidate_caches()
         return insert_count, update_count
 
-    def get_all_units_as_df(self) -> pd.DataFrame:
-        """Retrieves all units and returns them as a pandas DataFrame."""
+    def get_all_units_as_df(self, fields: Optional[Tuple[str, ...]] = None) -> pd.DataFrame:
+        """Retrieves all units (optionally only `fields`) and returns them as a pandas DataFrame."""
+        return load_all_units_df(fields)
+
+    @staticmethod
+    def _to_arrow_table(df: pd.DataFrame) -> pa.Table:
+        """Converts a units DataFrame to Arrow, normalizing mixed-type object columns."""
+        df = df.copy()
+        for col in df.columns:
+            if df[col].dtype != object:
+                continue
+            value_types = {type(v) for v in df[col].dropna()}
+            if len(value_types) <= 1 or value_types <= {int, float}:
+                continue
+            if dict in value_types:
+                # Structured fields: drop placeholder values such as ''
+                df[col] = df[col].map(lambda v: v if isinstance(v, dict) else None)
+            else:
+                df[col] = df[col].map(lambda v: None if pd.isna(v) else str(v))
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    def snapshot_to_parquet(self, path: str = SNAPSHOT_PATH) -> bool:
+        """Writes the current units collection to a local Parquet snapshot."""
         try:
-            docs = self.db.collection('units').stream()
-            units_list = [doc.to_dict() for doc in docs]
-            
-            if not units_list:
-                return pd.DataFrame()
-            return pd.DataFrame(units_list)
+            df = self.get_all_units_as_df(tuple(DISPLAY_COLUMNS))
+            if df.empty:
+                self._invalidate_snapshot(path)
+                return False
+            pq.write_table(self._to_arrow_table(df), path, compression='zstd')
+            return True
         except Exception as e:
-            print(f"Error fetching units: {e}")
-            return pd.DataFrame()
+            print(f"Error writing units snapshot: {e}")
+            self._invalidate_snapshot(path)
+            return False
+
+    @staticmethod
+    def _invalidate_snapshot(path: str = SNAPSHOT_PATH):
+        """Removes the local snapshot so the next read goes back to Firestore."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _snapshot_is_fresh(path: str = SNAPSHOT_PATH) -> bool:
+        """True when the snapshot exists and is younger than SNAPSHOT_TTL_SECONDS."""
+        try:
+            return time.time() - os.path.getmtime(path) < SNAPSHOT_TTL_SECONDS
+        except OSError:
+            return False
+
+    @staticmethod
+    def snapshot_mtime(path: str = SNAPSHOT_PATH) -> Optional[float]:
+        """
+        Modification time of the local snapshot, or None when there is none. Every
+        write through the service drops the snapshot, so this changes for all
+        sessions whenever the units change.
+        """
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+
+    @classmethod
+    def _invalidate_caches(cls, path: str = SNAPSHOT_PATH):
+        """Drops the cached unit reads and the local snapshot after a write."""
+        clear_unit_caches()
+        cls._invalidate_snapshot(path)
+
+    def get_units_snapshot_df(self, path: str = SNAPSHOT_PATH) -> pd.DataFrame:
+        """
+        Returns the display columns of all units from the local Parquet snapshot,
+        (re)building it from Firestore when missing or older than SNAPSHOT_TTL_SECONDS.
+        """
+        if not self._snapshot_is_fresh(path):
+            # Drop a stale snapshot, and the in-memory read behind it, so both are rebuilt
+            load_all_units_df.clear()
+            self._invalidate_snapshot(path)
+        if not os.path.exists(path) and not self.snapshot_to_parquet(path):
+            df = self.get_all_units_as_df(tuple(DISPLAY_COLUMNS))
+            return df[[c for c in DISPLAY_COLUMNS if c in df.columns]]
+        try:
+            available = set(pq.read_schema(path).names)
+            columns = [c for c in DISPLAY_COLUMNS if c in available]
+            return pq.read_table(path, columns=columns).to_pandas()
+        except Exception as e:
+            print(f"Error reading units snapshot: {e}")
+            self._invalidate_snapshot(path)
+            df = self.get_all_units_as_df(tuple(DISPLAY_COLUMNS))
+            return df[[c for c in DISPLAY_COLUMNS if c in df.columns]]
 
     def get_unit_by_id(self, unit_id: str) -> Optional[Dict[str, Any]]:
         """Retrieves a single unit's data by its document ID."""
@@ -307,16 +566,78 @@ class FirestoreService:
             print(f"Error fetching unit {unit_id}: {e}")
             return None
 
+    def get_units_by_ids(self, unit_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retrieves many units in one batched read, as {unit_id: data}; missing units are left out."""
+        if not unit_ids:
+            return {}
+        try:
+            units_collection = self.db.collection('units')
+            refs = [units_collection.document(unit_id) for unit_id in unit_ids]
+            return {doc.id: doc.to_dict() for doc in self.db.get_all(refs) if doc.exists}
+        except Exception as e:
+            print(f"Error fetching {len(unit_ids)} units: {e}")
+            raise  # Re-raise so callers never mistake a failed read for missing units
+
     def update_unit(self, unit_id: str, data: Dict[str, Any]):
         """Updates a specific unit with the provided data dictionary."""
         if not data:
             return
         try:
             self.db.collection('units').document(unit_id).update(data)
+            self._invalidate_caches()
         except Exception as e:
             print(f"Error updating unit {unit_id}: {e}")
             raise  # Re-raise so the UI can handle it
 
+    def bulk_update(self, updates: List[Tuple[str, Dict[str, Any]]]):
+        """Applies many (unit_id, data) updates using batched writes."""
+        try:
+            units_collection = self.db.collection('units')
+            batch = self.db.batch()
+            count = 0
+            
+            for unit_id, data in updates:
+                if not data:
+                    continue
+                batch.update(units_collection.document(unit_id), data)
+                count += 1
+                
+                # Commit batch every 500 operations (Firestore limit)
+                if count % 500 == 0:
+                    batch.commit()
+                    batch = self.db.batch()
+            
+            # Commit remaining operations
+            if count % 500 != 0:
+                batch.commit()
+        except Exception as e:
+            print(f"Error applying bulk update: {e}")
+            self._invalidate_caches()
+            raise  # Re-raise so the UI can handle it
+        if count:
+            self._invalidate_caches()
+
+    def _bulk_writer(self, failed: List[str], succeeded: Optional[List[str]] = None):
+        """
+        Returns a BulkWriter that retries a failed write a few times, then gives
+        up on it and records the document ID in `failed`. Completed writes are
+        recorded in `succeeded` when given.
+        """
+        writer = self.db.bulk_writer()
+        if succeeded is not None:
+            writer.on_write_result(lambda ref, _result, _writer: succeeded.append(ref.id))
+
+        def on_write_error(error, _writer) -> bool:
+            if error.attempts < 5:
+                return True
+            doc_id = error.operation.reference.id
+            print(f"Error writing document {doc_id}: {error.message}")
+            failed.append(doc_id)
+            return False
+
+        writer.on_write_error(on_write_error)
+        return writer
+
     def log_geocoding_failure(self, unit_data: Dict, reason: str):
         """Logs a geocoding failure to a separate collection."""
         failure_data = {
@@ -327,10 +648,10 @@ class FirestoreService:
         self.db.collection('geocoding_failures').add(failure_data)
 
     def get_geocoding_failures_df(self) -> pd.DataFrame:
-        """Retrieves all geocoding failures."""
+        """Retrieves all geocoding failures, with each document's ID as `failure_id`."""
         try:
             docs = self.db.collection('geocoding_failures').stream()
-            failures = [doc.to_dict() for doc in docs]
+            failures = [{**doc.to_dict(), 'failure_id': doc.id} for doc in docs]
             return pd.DataFrame(failures)
         except Exception as e:
             print(f"Error fetching geocoding failures: {e}")
@@ -339,9 +660,9 @@ class FirestoreService:
     def get_geocoding_failure_count(self) -> int:
         """Counts the number of geocoding failures."""
         try:
-            # Note: This iterates through all documents. For very large collections,
-            # a distributed counter would be more efficient.
-            return len(list(self.db.collection('geocoding_failures').stream()))
+            # Server-side count aggregation: billed as one read, no documents transferred
+            result = self.db.collection('geocoding_failures').count().get()
+            return int(result[0][0].value)
         except Exception as e:
             print(f"Error counting geocoding failures: {e}")
             return 0
@@ -350,6 +671,22 @@ class FirestoreService:
         """Deletes a specific geocoding failure document."""
         self.db.collection('geocoding_failures').document(failure_id).delete()
 
+    def delete_geocoding_failures(self, failure_ids: List[str]):
+        """Deletes many geocoding failure documents using batched writes."""
+        failures_collection = self.db.collection('geocoding_failures')
+        batch = self.db.batch()
+        for count, failure_id in enumerate(failure_ids, 1):
+            batch.delete(failures_collection.document(failure_id))
+            
+            # Commit batch every 500 operations (Firestore limit)
+            if count % 500 == 0:
+                batch.commit()
+                batch = self.db.batch()
+        
+        # Commit remaining operations
+        if len(failure_ids) % 500 != 0:
+            batch.commit()
+
     def reprocess_existing_data(self) -> tuple[int, int]:
         """
         Reprocess existing units in the database to apply new data parsing rules.
@@ -357,33 +694,43 @@ class FirestoreService:
         """
         try:
             docs = self.db.collection('units').stream()
-            success_count = 0
             error_count = 0
+            failed, succeeded = [], []
+            # The bulk writer sends the sets in parallel; outcomes come back via its callbacks
+            writer = self._bulk_writer(failed, succeeded)
             
             for doc in docs:
                 try:
                     current_data = doc.to_dict()
+                    stored_hash = current_data.pop('_schema_hash', None)
                     # Reparse the data with new rules
                     parsed_data = self._parse_and_clean_data(current_data)
+                    # Preserve important metadata
+                    parsed_data.update({
+                        'id': current_data.get('id'),
+                        'first_seen_date': current_data.get('first_seen_date'),
+                        'last_seen_date': current_data.get('last_seen_date'),
+                        'status': current_data.get('status', 'available'),
+                        'favorite': current_data.get('favorite', False),
+                        'batch_id': current_data.get('batch_id')
+                    })
                     
-                    # Only update if there are changes
-                    if parsed_data != current_data:
-                        # Preserve important metadata
-                        parsed_data.update({
-                            'id': current_data.get('id'),
-                            'first_seen_date': current_data.get('first_seen_date'),
-                            'last_seen_date': current_data.get('last_seen_date'),
-                            'status': current_data.get('status', 'available'),
-                            'batch_id': current_data.get('batch_id')
-                        })
-                        
-                        self.db.collection('units').document(doc.id).set(parsed_data)
-                        success_count += 1
+                    # Only update if the reparse differs from what was last written
+                    new_hash = self._schema_hash(parsed_data)
+                    if new_hash != stored_hash:
+                        parsed_data['_schema_hash'] = new_hash
+                        writer.set(doc.reference, parsed_data)
                         
                 except Exception as e:
                     print(f"Error reprocessing document {doc.id}: {e}")
                     error_count += 1
+
+            # Wait for all pooled writes to finish
+            writer.close()
+            success_count = len(succeeded)
+            error_count += len(failed)
                     
+            self._invalidate_caches()
             return success_count, error_count
             
         except Exception as e:
@@ -394,56 +741,57 @@ class FirestoreService:
         """Updates the favorite status of a specific unit."""
         try:
             self.db.collection('units').document(unit_id).update({'favorite': is_favorite})
+            self._invalidate_caches()
         except Exception as e:
             print(f"Error updating favorite status for unit {unit_id}: {e}")
             raise
 
-    def get_favorite_units_df(self) -> pd.DataFrame:
-        """Retrieves only favorite units and returns them as a pandas DataFrame."""
+    def get_favorite_units_page(self, cursor=None, limit: int = FAVORITES_PAGE_SIZE):
+        """
+        Retrieves one page of favorite units, most recently seen first, as
+        (DataFrame, next_cursor). Pass the previous page's next_cursor to get the
+        following page; next_cursor is None on the last page. Columns are object
+        dtype so rows keep the stored values (ints stay ints next to missing ones).
+        """
         try:
-            docs = self.db.collection('units').where('favorite', '==', True).stream()
-            units_list = [doc.to_dict() for doc in docs]
-            
-            if not units_list:
-                return pd.DataFrame()
-            return pd.DataFrame(units_list)
+            query = (
+                self.db.collection('units')
+                .where('favorite', '==', True)
+                .order_by('last_seen_date', direction=firestore.Query.DESCENDING)
+                .select(_FAVORITE_FIELDS)
+                .limit(limit)
+            )
+            if cursor is not None:
+                query = query.start_after(cursor)
+            docs = list(query.stream())
+            next_cursor = docs[-1] if len(docs) == limit else None
+            return pd.DataFrame([doc.to_dict() for doc in docs], dtype=object), next_cursor
         except Exception as e:
-            print(f"Error fetching favorite units: {e}")
-            return pd.DataFrame()
+            print(f"Error fetching favorite units page: {e}")
+            return pd.DataFrame(), None
+
+    def get_favorite_count(self) -> int:
+        """Counts favorite units with a server-side count aggregation."""
+        try:
+            result = self.db.collection('units').where('favorite', '==', True).count().get()
+            return int(result[0][0].value)
+        except Exception as e:
+            print(f"Error counting favorite units: {e}")
+            return 0
 
     def clear_database(self):
         """Clears all units from the database."""
         try:
-            # Get all documents in the units collection
-            docs = self.db.collection('units').stream()
-            
-            # Delete in batches for efficiency
-            batch = self.db.batch()
-            count = 0
-            
-            for doc in docs:
-                batch.delete(doc.reference)
-                count += 1
-                
-                # Commit batch every 500 operations (Firestore limit)
-                if count % 500 == 0:
-                    batch.commit()
-                    batch = self.db.batch()
-            
-            # Commit remaining operations
-            if count % 500 != 0:
-                batch.commit()
-                
-            # Also clear geocoding failures
-            failure_docs = self.db.collection('geocoding_failures').stream()
-            batch = self.db.batch()
-            
-            for doc in failure_docs:
-                batch.delete(doc.reference)
-            
-            batch.commit()
+            # Delete every unit, and the geocoding failures, through one parallel bulk writer
+            failed = []
+            writer = self._bulk_writer(failed)
+            for collection in ['units', 'geocoding_failures']:
+                for doc in self.db.collection(collection).select([]).stream():
+                    writer.delete(doc.reference)
+            writer.close()
             
-            return True
+            self._invalidate_caches()
+            return not failed
         except Exception as e:
             print(f"Error clearing database: {e}")
             return False
@@ -454,45 +802,59 @@ class FirestoreService:
         Returns tuple of (success_count, error_count).
         """
         try:
-            docs = self.db.collection('units').stream()
-            success_count = 0
-            error_count = 0
+            # Firestore range filters only match values of the operand's type, so this
+            # reads just the units whose parking is stored as a string (and only that field)
+            docs = self.db.collection('units').where('parking', '>=', '').select(['parking']).stream()
+            failed, succeeded = [], []
+            writer = self._bulk_writer(failed, succeeded)
             
             for doc in docs:
-                try:
-                    current_data = doc.to_dict()
-                    needs_update = False
-                    
-                    # Check parking field
-                    if 'parking' in current_data:
-                        parking_value = current_data['parking']
-                        if isinstance(parking_value, str):
-                            if any(word in parking_value.lower() for word in ['no parking', 'none', 'n/a', 'not available']):
-                                current_data['parking'] = 0
-                                needs_update = True
-                            else:
-                                # Try to extract number
-                                numbers = re.findall(r'\d+', parking_value)
-                                if numbers:
-                                    current_data['parking'] = int(numbers[0])
-                                    needs_update = True
-                                else:
-                                    current_data['parking'] = 0
-                                    needs_update = True
-                    
-                    if needs_update:
-                        self.db.collection('units').document(doc.id).update({'parking': current_data['parking']})
-                        success_count += 1
-                        
-                except Exception as e:
-                    print(f"Error fixing parking data for document {doc.id}: {e}")
-                    error_count += 1
+                parking_value = doc.to_dict().get('parking', '')
+                if _NO_PARKING_RE.search(parking_value.lower()):
+                    parking = 0
+                else:
+                    # Try to extract number
+                    numbers = _INT_RE.findall(parking_value)
+                    parking = int(numbers[0]) if numbers else 0
+                writer.update(doc.reference, {'parking': parking})
+
+            # Wait for all pooled writes to finish
+            writer.close()
                     
-            return success_count, error_count
+            self._invalidate_caches()
+            return len(succeeded), len(failed)
             
         except Exception as e:
             print(f"Error during parking data fix: {e}")
             return 0, 1
 
+@st.cache_data(ttl=300, show_spinner=False)
+def load_all_units_df(fields: Optional[Tuple[str, ...]] = None) -> pd.DataFrame:
+    """
+    Streams the whole units collection, projected to `fields` when given;
+    cached in-process and cleared on every write.
+    """
+    try:
+        query = FirestoreService().db.collection('units')
+        docs = (query.select(fields) if fields else query).stream()
+        # from_records collects the stream into a list itself, so this saves no memory over list()
+        return pd.DataFrame.from_records(doc.to_dict() for doc in docs)
+    except Exception as e:
+        print(f"Error fetching units: {e}")
+        return pd.DataFrame()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_unit(unit_id: str) -> Optional[Dict[str, Any]]:
+    """Reads a single unit for the details views; cached briefly and cleared on every write."""
+    return FirestoreService().get_unit_by_id(unit_id)
+
+# Cached unit reads that go stale on a write; cleared individually so unrelated caches survive
+_CACHES_TO_INVALIDATE = (load_all_units_df, fetch_unit)
+
+def clear_unit_caches():
+    """Drops every cached unit read (but not the local snapshot)."""
+    for cached in _CACHES_TO_INVALIDATE:
+        cached.clear()
+
 # Singleton instance for use across the Streamlit app
 firestore_service = FirestoreService()
\ No newline at end of file
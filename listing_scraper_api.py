@@ -1,11 +1,43 @@
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, Query, Response
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Union
-import requests
-from bs4 import BeautifulSoup
+from typing import List, Dict, Optional, Union, Tuple
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor
+import aiohttp
+import asyncio
+from bs4 import BeautifulSoup, SoupStrainer
+import html
+import os
 import re
+import threading
+import time
 
-app = FastAPI()
+try:
+    import ahocorasick  # single-pass amenity keyword matching (pyahocorasick)
+except ImportError:  # e.g. a platform without a pyahocorasick wheel
+    ahocorasick = None
+
+# ---------- HTTP Client ----------
+# One pooled session for the app's lifetime, so scrapes reuse connections;
+# parsing runs in a process pool so it never blocks the event loop
+
+FETCH_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+FETCH_TIMEOUT = aiohttp.ClientTimeout(total=15)
+FETCH_CONNECTIONS = 16
+FETCH_RETRIES = 3
+RETRY_STATUSES = {429, 502, 503, 504}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    connector = aiohttp.TCPConnector(limit=FETCH_CONNECTIONS, keepalive_timeout=60)
+    app.state.http = aiohttp.ClientSession(connector=connector, headers=FETCH_HEADERS, timeout=FETCH_TIMEOUT)
+    app.state.parse_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    yield
+    await app.state.http.close()
+    app.state.parse_pool.shutdown(cancel_futures=True)
+
+app = FastAPI(lifespan=lifespan)
 
 # ---------- Data Model ----------
 class ScrapedListingData(BaseModel):
@@ -20,27 +52,160 @@ class ScrapedListingData(BaseModel):
     utilities: Dict[str, str]  # owner/tenant/unknown for each utility
     photos: List[str]
 
+class BatchScrapeResult(BaseModel):
+    url: str
+    data: Optional[ScrapedListingData] = None
+    error: Optional[str] = None
+
+# ---------- Patterns ----------
+# Compiled once at import; the getters below try them in order
+
+SQFT_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'(\d+)\s*sq\.?\s*ft\.?',
+    r'(\d+)\s*square\s*feet',
+    r'size:?\s*(\d+)',
+    r'(\d+)\s*sqft'
+))
+SQ_ELEM_RE = re.compile(r'\d+\s*sq', re.IGNORECASE)
+DIGITS_RE = re.compile(r'\d+')
+
+BEDROOM_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'(\d+)\s*bed',
+    r'(\d+)\s*br',
+    r'bedroom[s]?:?\s*(\d+)'
+))
+
+BATHROOM_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'(\d+\.?\d*)\s*bath',
+    r'(\d+\.?\d*)\s*ba',
+    r'bathroom[s]?:?\s*(\d+\.?\d*)'
+))
+
+# A dollar figure: $1,500 / $1500 / $ 950; the single group is the number with any commas
+RENT_RE = re.compile(r'\$\s*(\d{1,3}(?:,\d{3})+|\d{3,5})')
+
+# Subsidy keywords: group 1 marks HACLA, group 2 marks Housing Choice/Section 8
+SUBSIDY_RE = re.compile(r'(hacla|housing authority)|(housing choice|section 8|voucher)', re.IGNORECASE)
+
+UTILITIES = ['electricity', 'gas', 'water', 'sewer', 'trash', 'internet', 'cable']
+# Zero-width so overlapping mentions are all seen; group 2 is set when an owner phrase follows
+UTILITY_MENTION_RE = re.compile(r'(?=(' + '|'.join(UTILITIES) + r')( included| paid by owner)?)', re.IGNORECASE)
+
+# Page text without markup, matching what soup.get_text() returns
+HIDDEN_RE = re.compile(r'<!--.*?-->|<(script|style)\b[^>]*>.*?</\1\s*>', re.DOTALL | re.IGNORECASE)
+TAG_RE = re.compile(r'<[^>]+>')
+
+# Every structured lookup (availability span, amenity rows, utilities,
+# photos, square-feet cells) lives in one of these tags
+STRUCTURE_STRAINER = SoupStrainer(['span', 'div', 'td'])
+
+# ---------- Amenities ----------
+
+# Same amenity categories as in firestore_service.py
+AMENITY_CATEGORIES = {
+    'community': [
+        'clubhouse', 'fitness_center', 'gym', 'pool', 'spa', 'hot_tub', 'sauna',
+        'business_center', 'conference_room', 'rooftop_deck', 'courtyard',
+        'playground', 'dog_park', 'barbecue_area', 'fire_pit', 'game_room',
+        'theater_room', 'library', 'concierge', 'doorman', 'security'
+    ],
+    'indoor': [
+        'air_conditioning', 'heating', 'hardwood_floors', 'carpet', 'tile_floors',
+        'walk_in_closet', 'ceiling_fans', 'fireplace', 'balcony', 'patio',
+        'bay_windows', 'high_ceilings', 'loft', 'den', 'office_space'
+    ],
+    'kitchen': [
+        'dishwasher', 'garbage_disposal', 'microwave', 'refrigerator', 'stove',
+        'oven', 'granite_counters', 'stainless_steel_appliances', 'island',
+        'breakfast_bar', 'pantry', 'wine_fridge'
+    ],
+    'other': [
+        'parking_garage', 'covered_parking', 'laundry_in_unit', 'laundry_on_site',
+        'elevator', 'wheelchair_accessible', 'storage_unit', 'bike_storage'
+    ]
+}
+
+AMENITY_SYNONYMS = {
+    'fitness_center': ['gym', 'fitness room', 'workout room'],
+    'air_conditioning': ['ac', 'a/c', 'central air'],
+    'garbage_disposal': ['disposal', 'garbage disposal'],
+    'laundry_in_unit': ['washer dryer', 'w/d', 'laundry hookup'],
+    'parking_garage': ['garage', 'covered parking'],
+    'wheelchair_accessible': ['ada', 'accessible', 'handicap accessible']
+}
+
+# (category, amenity, keywords) with every name variation and synonym expanded once
+AMENITY_LOOKUP = [
+    (category, amenity, tuple(dict.fromkeys([
+        amenity,
+        amenity.replace('_', ' '),
+        amenity.replace('_', '-'),
+        amenity.replace('_', ''),
+        *AMENITY_SYNONYMS.get(amenity, [])
+    ])))
+    for category, amenity_list in AMENITY_CATEGORIES.items()
+    for amenity in amenity_list
+]
+
+# All-False amenity flags; each scrape copies it and sets only what it finds
+AMENITIES_TEMPLATE = {category: dict.fromkeys(amenity_list, False) for category, amenity_list in AMENITY_CATEGORIES.items()}
+
+def _build_amenity_automaton():
+    """Index every amenity keyword; each keyword maps to the (category, amenity) slots it marks."""
+    slots_by_keyword = {}
+    for category, amenity, keywords in AMENITY_LOOKUP:
+        for keyword in keywords:
+            slots_by_keyword.setdefault(keyword, []).append((category, amenity))
+
+    automaton = ahocorasick.Automaton()
+    for keyword, slots in slots_by_keyword.items():
+        automaton.add_word(keyword, tuple(slots))
+    automaton.make_automaton()
+    return automaton
+
+AMENITY_AUTOMATON = _build_amenity_automaton() if ahocorasick is not None else None
+
 # ---------- Scraper Core ----------
 
-def fetch_listing_data(url: str) -> ScrapedListingData:
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    res = requests.get(url, headers=headers)
-    res.raise_for_status()
-    soup = BeautifulSoup(res.text, 'html.parser')
+async def fetch_listing_data(session: aiohttp.ClientSession, parse_pool: Executor, url: str) -> ScrapedListingData:
+    # Transient statuses and dropped connections are retried with exponential backoff
+    for attempt in range(FETCH_RETRIES + 1):
+        try:
+            async with session.get(url) as res:
+                if res.status in RETRY_STATUSES and attempt < FETCH_RETRIES:
+                    await asyncio.sleep(0.2 * 2 ** attempt)
+                    continue
+                res.raise_for_status()
+                raw_html = await res.text()
+            break
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == FETCH_RETRIES:
+                raise
+            await asyncio.sleep(0.2 * 2 ** attempt)
+    return await asyncio.get_running_loop().run_in_executor(parse_pool, parse_listing_html, url, raw_html)
+
+def parse_listing_html(url: str, raw_html: str) -> ScrapedListingData:
+    """Parse a listing page: structured fields from a strained soup, the rest from the page text."""
+    soup = BeautifulSoup(raw_html, 'lxml', parse_only=STRUCTURE_STRAINER)
+    text = get_page_text(raw_html)
 
     return ScrapedListingData(
         url=url,
         availability=get_availability(soup),
-        square_feet=get_square_feet(soup),
-        bedrooms=get_bedrooms(soup),
-        bathrooms=get_bathrooms(soup),
-        rent=get_rent(soup),
-        subsidy=get_subsidy(soup),
-        amenities=get_amenities(soup),
-        utilities=get_utilities(soup),
+        square_feet=get_square_feet(soup, text),
+        bedrooms=get_bedrooms(text),
+        bathrooms=get_bathrooms(text),
+        rent=get_rent(text),
+        subsidy=get_subsidy(text),
+        amenities=get_amenities(soup, text),
+        utilities=get_utilities(soup, text),
         photos=get_photos(soup)
     )
 
+def get_page_text(raw_html: str) -> str:
+    """Strip comments, scripts, styles and tags from raw HTML in one pass each."""
+    return html.unescape(TAG_RE.sub('', HIDDEN_RE.sub('', raw_html)))
+
 def get_availability(soup):
     """Extract availability as boolean."""
     tag = soup.find('span', {'id': 'spanAvailable'})
@@ -49,160 +214,95 @@ def get_availability(soup):
         return 'available' in text or 'vacant' in text
     return None
 
-def get_square_feet(soup):
+def get_square_feet(soup, text):
     """Extract square footage/size of the unit."""
-    # Look for square footage in various possible locations
-    sqft_patterns = [
-        r'(\d+)\s*sq\.?\s*ft\.?',
-        r'(\d+)\s*square\s*feet',
-        r'size:?\s*(\d+)',
-        r'(\d+)\s*sqft'
-    ]
-    
     # Check in text content
-    text = soup.get_text()
-    for pattern in sqft_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        if matches:
+    for pattern in SQFT_PATTERNS:
+        match = pattern.search(text)
+        if match:
             try:
-                return int(matches[0])
+                return int(match.group(1))
             except ValueError:
                 continue
     
     # Check in specific elements that might contain square footage
-    sqft_elements = soup.find_all(['span', 'div', 'td'], string=re.compile(r'\d+\s*sq', re.IGNORECASE))
+    sqft_elements = soup.find_all(['span', 'div', 'td'], string=SQ_ELEM_RE)
     for elem in sqft_elements:
         text = elem.get_text()
-        numbers = re.findall(r'\d+', text)
-        if numbers:
+        number = DIGITS_RE.search(text)
+        if number:
             try:
-                return int(numbers[0])
+                return int(number.group())
             except ValueError:
                 continue
     
     return None
 
-def get_bedrooms(soup):
+def get_bedrooms(text):
     """Extract number of bedrooms."""
-    # Look for bedroom information
-    bedroom_patterns = [
-        r'(\d+)\s*bed',
-        r'(\d+)\s*br',
-        r'bedroom[s]?:?\s*(\d+)',
-        r'studio'
-    ]
-    
-    text = soup.get_text().lower()
+    text = text.lower()
     
     # Check for studio
     if 'studio' in text:
         return 0
     
-    for pattern in bedroom_patterns[:-1]:  # Exclude studio pattern
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        if matches:
+    for pattern in BEDROOM_PATTERNS:
+        match = pattern.search(text)
+        if match:
             try:
-                return int(matches[0])
+                return int(match.group(1))
             except ValueError:
                 continue
     
     return None
 
-def get_bathrooms(soup):
+def get_bathrooms(text):
     """Extract number of bathrooms."""
-    bathroom_patterns = [
-        r'(\d+\.?\d*)\s*bath',
-        r'(\d+\.?\d*)\s*ba',
-        r'bathroom[s]?:?\s*(\d+\.?\d*)'
-    ]
-    
-    text = soup.get_text()
-    for pattern in bathroom_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        if matches:
+    for pattern in BATHROOM_PATTERNS:
+        match = pattern.search(text)
+        if match:
             try:
-                return float(matches[0])
+                return float(match.group(1))
             except ValueError:
                 continue
     
     return None
 
-def get_rent(soup):
-    """Extract rent amount."""
-    rent_patterns = [
-        r'\$(\d{1,4}),?(\d{3})',  # $1,500 or $1500
-        r'\$(\d{3,4})',           # $500-$9999
-        r'rent:?\s*\$(\d{1,4}),?(\d{3})?'
-    ]
-    
-    text = soup.get_text()
-    for pattern in rent_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        if matches:
-            try:
-                if len(matches[0]) == 2 and matches[0][1]:  # Handle comma-separated amounts
-                    return int(matches[0][0] + matches[0][1])
-                else:
-                    return int(matches[0] if isinstance(matches[0], str) else matches[0][0])
-            except (ValueError, IndexError):
-                continue
+def get_rent(text):
+    """Extract rent amount: the first figure of $1,000 or more, else the first of $100 or more."""
+    # Four-digit figures win over earlier smaller ones (deposits, fees), all in one scan
+    first_amount = None
+    for match in RENT_RE.finditer(text):
+        amount = int(match.group(1).replace(',', ''))
+        if amount >= 1000:
+            return amount
+        if first_amount is None:
+            first_amount = amount
     
-    return None
+    return first_amount
 
-def get_subsidy(soup):
+def get_subsidy(text):
     """Extract subsidy acceptance information."""
     subsidy_data = {'hacla': False, 'bc': False}
     
-    text = soup.get_text().lower()
-    
-    # Look for HACLA acceptance
-    if any(term in text for term in ['hacla', 'housing authority']):
-        subsidy_data['hacla'] = True
-    
-    # Look for Housing Choice/Section 8 acceptance
-    if any(term in text for term in ['housing choice', 'section 8', 'voucher']):
-        subsidy_data['bc'] = True
+    # One scan for HACLA and Housing Choice/Section 8 acceptance
+    for match in SUBSIDY_RE.finditer(text):
+        subsidy_data['hacla' if match.group(1) else 'bc'] = True
+        if subsidy_data['hacla'] and subsidy_data['bc']:
+            break
     
     return subsidy_data
 
-def get_amenities(soup):
+def get_amenities(soup, text):
     """Extract amenities in structured format matching our data model."""
-    # Define the same amenity categories as in firestore_service.py
-    AMENITY_CATEGORIES = {
-        'community': [
-            'clubhouse', 'fitness_center', 'gym', 'pool', 'spa', 'hot_tub', 'sauna',
-            'business_center', 'conference_room', 'rooftop_deck', 'courtyard',
-            'playground', 'dog_park', 'barbecue_area', 'fire_pit', 'game_room',
-            'theater_room', 'library', 'concierge', 'doorman', 'security'
-        ],
-        'indoor': [
-            'air_conditioning', 'heating', 'hardwood_floors', 'carpet', 'tile_floors',
-            'walk_in_closet', 'ceiling_fans', 'fireplace', 'balcony', 'patio',
-            'bay_windows', 'high_ceilings', 'loft', 'den', 'office_space'
-        ],
-        'kitchen': [
-            'dishwasher', 'garbage_disposal', 'microwave', 'refrigerator', 'stove',
-            'oven', 'granite_counters', 'stainless_steel_appliances', 'island',
-            'breakfast_bar', 'pantry', 'wine_fridge'
-        ],
-        'other': [
-            'parking_garage', 'covered_parking', 'laundry_in_unit', 'laundry_on_site',
-            'elevator', 'wheelchair_accessible', 'storage_unit', 'bike_storage'
-        ]
-    }
-    
     # Initialize all amenities as False
-    amenities_data = {}
-    for category, amenity_list in AMENITY_CATEGORIES.items():
-        amenities_data[category] = {}
-        for amenity in amenity_list:
-            amenities_data[category][amenity] = False
+    amenities_data = {category: flags.copy() for category, flags in AMENITIES_TEMPLATE.items()}
     
     # Get all text from the page for amenity checking
-    page_text = soup.get_text().lower()
+    page_text = text.lower()
     
     # Also check structured amenity sections
-    categories = soup.select('div.prop--cont--row')
+    categories = soup.find_all('div', class_='prop--cont--row')
     structured_amenities = []
     
     for cat in categories:
@@ -219,51 +319,28 @@ def get_amenities(soup):
     # Combine page text with structured amenities
     all_amenity_text = page_text + ' ' + ' '.join(structured_amenities)
     
-    # Check which amenities are present
-    for category, amenity_list in AMENITY_CATEGORIES.items():
-        for amenity in amenity_list:
-            # Create variations of the amenity name to check
-            amenity_variations = [
-                amenity,
-                amenity.replace('_', ' '),
-                amenity.replace('_', '-'),
-                amenity.replace('_', '')
-            ]
-            
-            # Add common synonyms
-            synonyms = {
-                'fitness_center': ['gym', 'fitness room', 'workout room'],
-                'air_conditioning': ['ac', 'a/c', 'central air'],
-                'garbage_disposal': ['disposal', 'garbage disposal'],
-                'laundry_in_unit': ['washer dryer', 'w/d', 'laundry hookup'],
-                'parking_garage': ['garage', 'covered parking'],
-                'wheelchair_accessible': ['ada', 'accessible', 'handicap accessible']
-            }
-            
-            if amenity in synonyms:
-                amenity_variations.extend(synonyms[amenity])
-            
-            # Check if any variation is found
-            for variation in amenity_variations:
-                if variation in all_amenity_text:
-                    amenities_data[category][amenity] = True
-                    break
+    # Check which amenities are present: one automaton pass finds every keyword
+    if AMENITY_AUTOMATON is not None:
+        for _, slots in AMENITY_AUTOMATON.iter(all_amenity_text):
+            for category, amenity in slots:
+                amenities_data[category][amenity] = True
+        return amenities_data
+
+    for category, amenity, keywords in AMENITY_LOOKUP:
+        if any(keyword in all_amenity_text for keyword in keywords):
+            amenities_data[category][amenity] = True
 
     return amenities_data
 
-def get_utilities(soup):
+def get_utilities(soup, text):
     """Extract utilities in structured format (owner/tenant/unknown)."""
-    UTILITIES = ['electricity', 'gas', 'water', 'sewer', 'trash', 'internet', 'cable']
-    
-    utilities_data = {}
-    for utility in UTILITIES:
-        utilities_data[utility] = 'unknown'  # default
+    utilities_data = dict.fromkeys(UTILITIES, 'unknown')  # default
     
     # Look for structured utilities section
     utilities_section = soup.find('div', {'data-section': 'utilities'})
     
     if utilities_section:
-        for col in utilities_section.select('div.utilities--col'):
+        for col in utilities_section.find_all('div', class_='utilities--col'):
             header = col.find('h4')
             items = col.find_all('li')
             if header and items:
@@ -279,24 +356,19 @@ def get_utilities(soup):
                             elif 'tenant' in header_text or 'renter' in header_text:
                                 utilities_data[utility] = 'tenant'
     
-    # Also check general page text for utility information
-    page_text = soup.get_text().lower()
+    # Also check general page text for utility information: a mention followed by
+    # "included"/"paid by owner" anywhere means owner, any other mention means tenant
+    mentioned = {}
+    for match in UTILITY_MENTION_RE.finditer(text):
+        utility = match.group(1).lower()
+        if match.group(2):
+            mentioned[utility] = 'owner'
+        else:
+            mentioned.setdefault(utility, 'tenant')
     
-    for utility in UTILITIES:
+    for utility, payer in mentioned.items():
         if utilities_data[utility] == 'unknown':  # Only update if not already set
-            utility_variations = [utility, utility.replace('_', ' ')]
-            
-            for variation in utility_variations:
-                if variation in page_text:
-                    # Look for context clues
-                    if any(phrase in page_text for phrase in [f'{variation} included', f'{variation} paid by owner']):
-                        utilities_data[utility] = 'owner'
-                    elif any(phrase in page_text for phrase in [f'{variation} separate', f'tenant pays {variation}']):
-                        utilities_data[utility] = 'tenant'
-                    else:
-                        # Default assumption if mentioned but unclear
-                        utilities_data[utility] = 'tenant'
-                    break
+            utilities_data[utility] = payer
 
     return utilities_data
 
@@ -306,18 +378,76 @@ def get_photos(soup):
     if not gallery:
         return photo_urls
 
+    seen = set()  # Deduplicate while keeping gallery order
     imgs = gallery.find_all('img')
     for img in imgs:
         url = img.get('data-src') or img.get('src')
         if url and 'no-photo' not in url:
             if url.startswith('/'):
                 url = 'https://www.affordablehousing.com' + url
-            photo_urls.append(url)
+            if url not in seen:
+                seen.add(url)
+                photo_urls.append(url)
+
+    return photo_urls
 
-    return list(set(photo_urls))  # Deduplicate
+# ---------- Response Cache ----------
+# Serialized responses keyed by URL, least recently used first. Entries are
+# immutable JSON strings, so requests never share a mutable model.
 
-# ---------- FastAPI Endpoint ----------
+SCRAPE_CACHE_SIZE = 1024
+SCRAPE_CACHE_TTL_SECONDS = 60 * 60
+
+_scrape_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_scrape_cache_lock = threading.Lock()
+
+def get_cached_listing(url: str) -> Optional[str]:
+    """Return the cached JSON for a URL if it is still fresh."""
+    with _scrape_cache_lock:
+        entry = _scrape_cache.get(url)
+        if entry is None:
+            return None
+        stored_at, payload = entry
+        if time.monotonic() - stored_at > SCRAPE_CACHE_TTL_SECONDS:
+            del _scrape_cache[url]
+            return None
+        _scrape_cache.move_to_end(url)
+        return payload
+
+def cache_listing(url: str, payload: str):
+    """Store a serialized listing, evicting the least recently used entry when full."""
+    with _scrape_cache_lock:
+        _scrape_cache[url] = (time.monotonic(), payload)
+        _scrape_cache.move_to_end(url)
+        if len(_scrape_cache) > SCRAPE_CACHE_SIZE:
+            _scrape_cache.popitem(last=False)
+
+async def scrape_to_json(url: str, fresh: bool = False) -> Tuple[str, str]:
+    """Return (listing JSON, 'HIT' or 'MISS'), scraping through the shared session on a miss."""
+    payload = None if fresh else get_cached_listing(url)
+    if payload is not None:
+        return payload, 'HIT'
+    payload = (await fetch_listing_data(app.state.http, app.state.parse_pool, url)).model_dump_json()
+    cache_listing(url, payload)
+    return payload, 'MISS'
+
+# ---------- FastAPI Endpoints ----------
 
 @app.get("/scrape", response_model=ScrapedListingData)
-def scrape_listing(url: str = Query(..., description="Full listing URL from affordablehousing.com")):
-    return fetch_listing_data(url) 
\ No newline at end of file
+async def scrape_listing(
+    url: str = Query(..., description="Full listing URL from affordablehousing.com"),
+    fresh: bool = Query(False, description="Bypass the response cache and re-scrape")
+):
+    payload, cache_status = await scrape_to_json(url, fresh)
+    return Response(content=payload, media_type='application/json', headers={'X-Cache': cache_status})
+
+@app.post("/scrape_batch", response_model=List[BatchScrapeResult])
+async def scrape_batch(urls: List[str], fresh: bool = Query(False, description="Bypass the response cache and re-scrape")):
+    """Scrape many listings concurrently; results keep the request order and a failure only affects its own URL."""
+    results = await asyncio.gather(*(scrape_to_json(url, fresh) for url in urls), return_exceptions=True)
+    return [
+        BatchScrapeResult(url=url, error=str(result) or type(result).__name__)
+        if isinstance(result, Exception)
+        else BatchScrapeResult(url=url, data=ScrapedListingData.model_validate_json(result[0]))
+        for url, result in zip(urls, results)
+    ] 
\ No newline at end of file
@@ -1,7 +1,49 @@
 import streamlit as st
 import pandas as pd
+import io
 from firestore_service import firestore_service
 
+# Shared by both CSV engines; the C engine additionally skips spaces after delimiters
+READ_CSV_OPTIONS = dict(
+    on_bad_lines='skip',  # Skip problematic lines
+    na_values=['', 'N/A', 'n/a', 'null', 'NULL', '-'],  # Treat these as NaN
+    keep_default_na=True
+)
+
+def matches_c_engine(df: pd.DataFrame, total_lines: int) -> bool:
+    """
+    True when a pyarrow-parsed frame is what the C engine would have produced:
+    no rows skipped, no leading whitespace, and only plain strings in text columns
+    (pyarrow turns ISO dates into date objects and empty columns into None).
+    """
+    if len(df) < total_lines:
+        return False
+    for name, col in df.items():
+        if str(name).startswith((' ', '\t')):
+            return False
+        if pd.api.types.is_numeric_dtype(col) or pd.api.types.is_bool_dtype(col):
+            continue
+        values = col.dropna()
+        if pd.api.types.infer_dtype(values, skipna=True) != 'string':
+            return False
+        if values.str.startswith((' ', '\t')).any():
+            return False
+    return True
+
+def read_uploaded_csv(raw: bytes, total_lines: int) -> pd.DataFrame:
+    """Parse with the multithreaded pyarrow engine, falling back to the C engine whenever the result could differ."""
+    try:
+        df = pd.read_csv(io.BytesIO(raw), engine='pyarrow', **READ_CSV_OPTIONS)
+        if matches_c_engine(df, total_lines):
+            return df
+    except Exception:
+        pass
+    return pd.read_csv(
+        io.BytesIO(raw), 
+        skipinitialspace=True,  # Remove leading whitespace
+        **READ_CSV_OPTIONS
+    )
+
 st.set_page_config(
     page_title="Upload Data", 
     page_icon=":material/upload_file:"
@@ -22,18 +64,16 @@ uploaded_file = st.file_uploader(
 
 if uploaded_file is not None:
     try:
+        # Read the upload once; both the parse and the line count use these bytes
+        raw = uploaded_file.getvalue()
+        
+        # Count newlines in C; a final line without a trailing newline still counts
+        total_lines = raw.count(b'\n') + (bool(raw) and not raw.endswith(b'\n')) - 1  # Subtract 1 for header
+        
         # Read the uploaded CSV into a DataFrame with robust parsing
-        df = pd.read_csv(
-            uploaded_file, 
-            on_bad_lines='skip',  # Skip problematic lines
-            skipinitialspace=True,  # Remove leading whitespace
-            na_values=['', 'N/A', 'n/a', 'null', 'NULL', '-'],  # Treat these as NaN
-            keep_default_na=True
-        )
+        df = read_uploaded_csv(raw, total_lines)
         
         # Check if any rows were skipped due to parsing issues
-        uploaded_file.seek(0)  # Reset file pointer
-        total_lines = sum(1 for line in uploaded_file) - 1  # Subtract 1 for header
         processed_rows = len(df)
         
         if processed_rows < total_lines:
@@ -74,9 +114,8 @@ if uploaded_file is not None:
                     
                     st.balloons()
                     
-                    # Clear any cached data to show updated results
-                    if hasattr(st, 'cache_data'):
-                        st.cache_data.clear()
+                    # The service drops its own caches on write; re-key the pages' cached views
+                    st.session_state.data_version = st.session_state.get('data_version', 0) + 1
                     
                 except Exception as e:
                     st.error(f"An error occurred while loading data into the database: {e}")
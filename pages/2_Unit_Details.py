@@ -2,6 +2,19 @@ import streamlit as st
 from firestore_service import firestore_service
 from datetime import datetime
 
+# Fields shown elsewhere on the page; everything else is listed under Property Information
+STANDARD_FIELDS = frozenset({
+    'id', 'property_address', 'unit', 'zip_code', 'bedrooms', 'area',
+    'status', 'first_seen_date', 'last_seen_date', 'latitude', 'longitude',
+    'level_of_interest', 'viewing_scheduled', 'availability_verified_date',
+    'amenities', 'questions_for_agent', 'notes', 'batch_id', 'display_name',
+    '_schema_hash'  # internal change-detection digest, not user data
+})
+
+STATUS_OPTIONS = ['available', 'favorite', 'not_interested', 'off_market']
+INTEREST_LEVELS = ["Not Set", "Low", "Medium", "High", "Very High"]
+INTEREST_INDEX = {level: i for i, level in enumerate(INTEREST_LEVELS)}
+
 st.set_page_config(
     page_title="Unit Details", 
     page_icon=":material/apartment:"
@@ -65,18 +78,12 @@ with col3:
 st.subheader("📋 Property Information")
 info_col1, info_col2 = st.columns(2)
 
-# Display all non-standard fields from the unit data
-standard_fields = {'id', 'property_address', 'unit', 'zip_code', 'bedrooms', 'area', 
-                  'status', 'first_seen_date', 'last_seen_date', 'latitude', 'longitude',
-                  'level_of_interest', 'viewing_scheduled', 'availability_verified_date',
-                  'amenities', 'questions_for_agent', 'notes', 'batch_id', 'display_name'}
-
-additional_fields = {}
-for k, v in unit_data.items():
-    if k not in standard_fields and v is not None:
-        str_v = str(v).strip()
-        if str_v:  # Only include non-empty strings
-            additional_fields[k] = str_v
+# Display all non-standard, non-empty fields from the unit data
+additional_fields = {
+    k: str_v
+    for k, v in unit_data.items()
+    if k not in STANDARD_FIELDS and v is not None and (str_v := str(v).strip())
+}
 
 if additional_fields:
     col_toggle = 0
@@ -132,39 +139,8 @@ with col2:
                     for amenity in available_amenities:
                         st.write(f"• {amenity.replace('_', ' ').title()}")
 
-# --- Actions ---
-with st.container(border=True):
-    st.subheader("Quick Actions")
-    status_options = ['available', 'favorite', 'not_interested', 'off_market']
-    current_status = unit_data.get('status', 'available')
-    try:
-        status_index = status_options.index(current_status)
-    except ValueError:
-        status_index = 0  # Default to 'available' if current status is not in options
-        
-    new_status = st.selectbox(
-        "Update Status",
-        options=status_options,
-        index=status_index,
-        key=f"status_select_{unit_id}"
-    )
-    if st.button("Save Status Change"):
-        firestore_service.update_unit(unit_id, {'status': new_status})
-        st.toast(f"Status updated to '{new_status}'!", icon="✅")
-        st.rerun()
-
-# --- Favorite Toggle ---
-current_favorite = unit_data.get('favorite', False)
-if st.button(f"{'⭐ Remove from Favorites' if current_favorite else '⭐ Add to Favorites'}", 
-            type="primary" if not current_favorite else "secondary"):
-    try:
-        firestore_service.update_favorite_status(unit_id, not current_favorite)
-        st.success(f"Unit {'removed from' if current_favorite else 'added to'} favorites!")
-        st.rerun()
-    except Exception as e:
-        st.error(f"Failed to update favorite status: {e}")
-
 # --- Tracking Information Form ---
+# Status, favorite and tracking details are saved together in one write
 with st.form("unit_details_form"):
     st.header("📝 Tracking & Notes")
     
@@ -174,10 +150,18 @@ with st.form("unit_details_form"):
     form_col1, form_col2 = st.columns(2)
     with form_col1:
         st.subheader("Details")
-        interest_levels = ["Not Set", "Low", "Medium", "High", "Very High"]
-        current_interest = unit_data.get('level_of_interest', 'Not Set')
-        current_interest_index = interest_levels.index(current_interest) if current_interest in interest_levels else 0
-        details_to_update['level_of_interest'] = st.selectbox("Level of Interest", interest_levels, index=current_interest_index)
+        current_status = unit_data.get('status', 'available')
+        status_index = STATUS_OPTIONS.index(current_status) if current_status in STATUS_OPTIONS else 0  # Default to 'available'
+        details_to_update['status'] = st.selectbox(
+            "Status",
+            options=STATUS_OPTIONS,
+            index=status_index,
+            key=f"status_select_{unit_id}"
+        )
+        details_to_update['favorite'] = st.checkbox("⭐ Favorite", value=bool(unit_data.get('favorite', False)))
+        
+        current_interest_index = INTEREST_INDEX.get(unit_data.get('level_of_interest', 'Not Set'), 0)
+        details_to_update['level_of_interest'] = st.selectbox("Level of Interest", INTEREST_LEVELS, index=current_interest_index)
         
         # Handle viewing scheduled date
         current_viewing_date = None
@@ -228,13 +212,11 @@ with st.form("unit_details_form"):
     submitted = st.form_submit_button("Save All Changes")
     if submitted:
         try:
-            # Filter out unchanged values to avoid unnecessary DB writes
-            final_details = {}
-            for k, v in details_to_update.items():
-                current_value = str(unit_data.get(k, '') or '')
-                new_value = str(v or '')
-                if new_value != current_value:
-                    final_details[k] = v
+            # Send only the fields that differ from the stored values, in a single write
+            final_details = {
+                k: v for k, v in details_to_update.items()
+                if str(v or '') != str(unit_data.get(k, '') or '')
+            }
             
             if final_details:
                 firestore_service.update_unit(unit_id, final_details)
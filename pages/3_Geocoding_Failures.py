@@ -14,10 +14,15 @@ You can review them here, manually find their coordinates, and then perhaps
 use a database tool to update them. Alternatively, you can resolve them by removing them.
 """)
 
-def load_failures():
+@st.cache_data(ttl=60, show_spinner=False)
+def load_failures(data_version: int):
+    """
+    Failures as a DataFrame; reruns within a minute reuse it, and deletes or Refresh clear it.
+    `data_version` is bumped by the other pages after processing or uploads.
+    """
     return firestore_service.get_geocoding_failures_df()
 
-failures_df = load_failures()
+failures_df = load_failures(st.session_state.get('data_version', 0))
 
 if failures_df.empty:
     st.success("🎉 No geocoding failures to report. All units were located successfully!")
@@ -25,40 +30,57 @@ if failures_df.empty:
 
 st.info(f"Found **{len(failures_df)}** unresolved geocoding failures.")
 
-# Display failures in an editable data editor
+# Unit fields shown for each failure; older records stored them at the top level
+UNIT_FIELDS = ['property_address', 'unit', 'zip_code']
+
+def to_display_frame(failures_df: pd.DataFrame) -> pd.DataFrame:
+    """Flattens the failures into one table row each, with the unit fields pulled out of unit_data."""
+    unit_data = failures_df['unit_data'] if 'unit_data' in failures_df.columns else pd.Series(None, index=failures_df.index)
+    units = pd.DataFrame(
+        [d if isinstance(d, dict) else {} for d in unit_data],
+        columns=UNIT_FIELDS, index=failures_df.index, dtype=object
+    )
+    fallback = failures_df.reindex(columns=UNIT_FIELDS)
+    units = units.where(unit_data.map(lambda d: isinstance(d, dict)), fallback, axis=0)
+    
+    display_df = pd.DataFrame({
+        'Address': units['property_address'],
+        'Unit': units['unit'],
+        'Zip': units['zip_code'],
+        'Reason': failures_df.get('reason', pd.Series('Unknown', index=failures_df.index)),
+        'Logged on': failures_df.get('timestamp', pd.Series('Unknown time', index=failures_df.index)),
+    })
+    return display_df.astype(object).fillna('N/A').astype(str)
+
+# Display failures in a single selectable table
 st.subheader("Unresolved Records")
 
-for index, row in failures_df.iterrows():
-    with st.container(border=True):
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            # Handle unit_data field which might be a dict
-            unit_data = row.get('unit_data', {})
-            if isinstance(unit_data, dict):
-                address = unit_data.get('property_address', 'N/A')
-                unit = unit_data.get('unit', 'N/A')
-                zip_code = unit_data.get('zip_code', 'N/A')
-            else:
-                # Fallback for old format
-                address = row.get('property_address', 'N/A')
-                unit = row.get('unit', 'N/A')
-                zip_code = row.get('zip_code', 'N/A')
-            
-            st.write(f"**Address:** {address}")
-            st.write(f"**Unit:** {unit}, **Zip:** {zip_code}")
-            st.write(f"**Reason:** {row.get('reason', 'Unknown')}")
-            st.caption(f"Logged on: {row.get('timestamp', 'Unknown time')}")
-        with col2:
-            st.write("") # Spacer
-            failure_id = row.get('failure_id') or index  # Use failure_id if available, otherwise index
-            if st.button("Mark as Resolved", key=f"delete_{failure_id}", help="This will remove the item from this list."):
-                try:
-                    firestore_service.delete_geocoding_failure(str(failure_id))
-                    st.toast(f"Record for '{address}' marked as resolved.")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Failed to delete record: {e}")
+selection = st.dataframe(
+    to_display_frame(failures_df),
+    key='failures_table',
+    on_select='rerun',
+    selection_mode='multi-row',
+    hide_index=True,
+    use_container_width=True
+).selection
+selected_ids = failures_df['failure_id'].iloc[selection.rows].astype(str).tolist()
+
+if st.button(
+    f"Mark {len(selected_ids)} Selected as Resolved",
+    type="primary",
+    disabled=not selected_ids,
+    help="This will remove the selected items from this list."
+):
+    try:
+        firestore_service.delete_geocoding_failures(selected_ids)
+        load_failures.clear()
+        st.toast(f"Marked {len(selected_ids)} record(s) as resolved.")
+        st.session_state.pop('failures_table', None)
+        st.rerun()
+    except Exception as e:
+        st.error(f"Failed to delete records: {e}")
 
 st.divider()
 if st.button("Refresh List"):
-    st.rerun() 
\ No newline at end of file
+    load_failures.clear()
+    st.rerun()
@@ -1,17 +1,175 @@
 import streamlit as st
 import pandas as pd
-from firestore_service import firestore_service
+from firestore_service import firestore_service, fetch_unit, clear_unit_caches
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
 
-# Import the modal function from Home.py
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+# Card columns coerced to int for display, to prevent Arrow conversion issues
+INT_COLUMNS = ('bedrooms', 'parking', 'zip_code', 'square_feet')
 
-def display_unit_details_modal(unit_id: str):
+# Fields shown on a favorite's card
+CARD_COLUMNS = ('id', 'property_address', 'unit', 'area', 'zip_code', 'bedrooms', 'square_feet', 'status', 'parking')
+
+def _clean_favorites_for_display(df: pd.DataFrame) -> pd.DataFrame:
+    """The card columns of a favorites page, with display-friendly dtypes."""
+    display_df = df[[col for col in CARD_COLUMNS if col in df.columns]].copy()
+    int_cols = [col for col in INT_COLUMNS if col in display_df.columns]
+    if int_cols:
+        display_df[int_cols] = display_df[int_cols].apply(pd.to_numeric, errors='coerce').fillna(0).astype(int)
+    if 'status' in display_df.columns:
+        display_df['status_display'] = display_df['status'].astype(str).str.replace('_', ' ', regex=False).str.title()
+    return display_df
+
+def amenity_lines(amenities) -> list:
+    """(category, available amenities) display pairs for a nested amenities dict."""
+    if not isinstance(amenities, dict):
+        return []
+    lines = []
+    for category, amenity_dict in amenities.items():
+        if isinstance(amenity_dict, dict):
+            available = [k for k, v in amenity_dict.items() if v is True]
+            if available:
+                lines.append((category.replace('_', ' ').title(), ', '.join(available).replace('_', ' ')))
+    return lines
+
+def _favorites_stats(df: pd.DataFrame) -> dict:
+    """Summary counts for a favorites page, from one narrow projection of the frame."""
+    stats_df = df[[col for col in ('bedrooms', 'zip_code', 'square_feet') if col in df.columns]]
+    stats = {}
+    if 'bedrooms' in stats_df.columns:
+        stats['bedrooms'] = stats_df['bedrooms'].value_counts().sort_index()
+    if 'zip_code' in stats_df.columns:
+        stats['zips'] = stats_df['zip_code'].value_counts().head(5)
+    if 'square_feet' in stats_df.columns:
+        stats['avg_square_feet'] = pd.to_numeric(stats_df['square_feet'], errors='coerce').mean()
+    return stats
+
+@st.cache_resource
+def _prefetch_pool() -> ThreadPoolExecutor:
+    """Shared worker for reading the next favorites page ahead of the user."""
+    return ThreadPoolExecutor(max_workers=2)
+
+def bump_favorites_version():
+    """Marks the loaded favorites page (and any prefetched one) stale, e.g. after membership changes."""
+    st.session_state.favorites_version = st.session_state.get('favorites_version', 0) + 1
+
+def prefetch_next_page(page_number: int, next_cursor, version: int):
+    """Starts reading the page after this one, so 'Next' does not wait on Firestore."""
+    if next_cursor is None:
+        return
+    prefetch = st.session_state.get('favorites_prefetch')
+    if prefetch is not None and prefetch['cursor'] is next_cursor and prefetch['version'] == version:
+        return
+    future = _prefetch_pool().submit(firestore_service.get_favorite_units_page, next_cursor)
+    st.session_state.favorites_prefetch = {
+        'number': page_number + 1, 'cursor': next_cursor, 'version': version, 'future': future,
+    }
+
+def load_favorites_page():
+    """
+    Returns (favorites_df, display_df, stats, next_cursor) for the current page. The page,
+    its display copy, summary stats and the favorites count are kept in session state, so
+    reruns (including those after optimistic edits) reuse them until the page changes or
+    favorites_version is bumped. Paging keeps the count; a version bump re-counts.
+    """
+    page_number = len(st.session_state.favorites_cursors)
+    page = st.session_state.get('favorites_page')
+    if page is None or page['number'] != page_number or page['version'] != st.session_state.get('favorites_version', 0):
+        cursor = st.session_state.favorites_cursors[-1]
+        wait_for_pending_writes()
+        # Read after the writes settle: a failed write bumps the version
+        version = st.session_state.get('favorites_version', 0)
+        prefetch = st.session_state.pop('favorites_prefetch', None)
+        if (prefetch is not None and prefetch['number'] == page_number
+                and prefetch['cursor'] is cursor and prefetch['version'] == version):
+            favorites_df, next_cursor = prefetch['future'].result()
+        else:
+            favorites_df, next_cursor = firestore_service.get_favorite_units_page(cursor)
+        if 'amenities' in favorites_df.columns:
+            # Flattened once per page, so the details panel does not walk the nested dict on every rerun
+            favorites_df['amenity_lines'] = [amenity_lines(a) for a in favorites_df['amenities']]
+        if page is not None and page['version'] == version:
+            count = page['count']
+        else:
+            count = firestore_service.get_favorite_count()
+        page = st.session_state.favorites_page = {
+            'number': page_number,
+            'version': version,
+            'df': favorites_df,
+            'display_df': _clean_favorites_for_display(favorites_df),
+            'stats': _favorites_stats(favorites_df),
+            'next_cursor': next_cursor,
+            'count': count,
+        }
+    prefetch_next_page(page_number, page['next_cursor'], page['version'])
+    return page['df'], page['display_df'], page['stats'], page['next_cursor']
+
+@st.cache_resource
+def _write_pool() -> ThreadPoolExecutor:
+    """Shared workers for Firestore writes the page does not wait on."""
+    return ThreadPoolExecutor(max_workers=4)
+
+def submit_write(description: str, write, *args):
+    """
+    Runs a service write on the write pool and tracks it in session state until a
+    rerun collects its result (see collect_finished_writes).
+    """
+    future = _write_pool().submit(write, *args)
+    st.session_state.pending_writes = st.session_state.get('pending_writes', []) + [(description, future)]
+
+def collect_finished_writes():
+    """
+    Settles this session's finished background writes. Successful writes mark the
+    other pages' unit views stale; a failed one is reported, and the favorites page
+    is reloaded so it drops the optimistic change.
+    """
+    still_pending = []
+    for description, future in st.session_state.get('pending_writes', []):
+        if not future.done():
+            still_pending.append((description, future))
+        elif future.exception() is not None:
+            st.error(f"Failed to save {description}: {future.exception()}")
+            bump_favorites_version()
+        else:
+            bump_data_version()
+    st.session_state.pending_writes = still_pending
+
+def pending_write_count() -> int:
+    """Number of this session's background writes still in flight."""
+    return len(st.session_state.get('pending_writes', []))
+
+def wait_for_pending_writes():
+    """Blocks until this session's background writes land, so a re-read sees them."""
+    wait([future for _, future in st.session_state.get('pending_writes', [])])
+    collect_finished_writes()
+
+def bump_data_version():
+    """Marks the other pages' cached unit views as stale after a write in this session."""
+    st.session_state.data_version = st.session_state.get('data_version', 0) + 1
+
+def save_status(unit_id: str, new_status: str):
+    """Apply a status change to the loaded page right away and write it to Firestore in the background."""
+    page = st.session_state.get('favorites_page')
+    if page is not None:
+        page_df, display_df = page['df'], page['display_df']
+        page_df.loc[page_df['id'] == unit_id, 'status'] = new_status
+        status_display = new_status.replace('_', ' ').title()
+        display_df.loc[display_df['id'] == unit_id, ['status', 'status_display']] = [new_status, status_display]
+    submit_write(f"status for unit {unit_id}", firestore_service.update_unit, unit_id, {'status': new_status})
+
+def select_unit(unit_id: str):
+    """Button callback: show details for a unit."""
+    st.session_state.selected_unit_id = unit_id
+
+def close_unit_details():
+    """Button callback: hide the details panel."""
+    st.session_state.pop('selected_unit_id', None)
+
+def display_unit_details_modal(unit_id: str, unit_data: dict = None):
     """Display unit details in a modal-like interface using session state."""
     try:
-        unit_data = firestore_service.get_unit_by_id(unit_id)
+        if unit_data is None:
+            unit_data = fetch_unit(unit_id)  # cached briefly; cleared by the service on every write
         
         if not unit_data:
             st.error(f"No unit found with ID: {unit_id}")
@@ -63,18 +221,18 @@ def display_unit_details_modal(unit_id: str):
                 # Amenities
                 if 'amenities' in unit_data and isinstance(unit_data['amenities'], dict):
                     st.write("**Amenities:**")
-                    for category, amenity_dict in unit_data['amenities'].items():
-                        if isinstance(amenity_dict, dict):
-                            available = [k for k, v in amenity_dict.items() if v is True]
-                            if available:
-                                st.write(f"• {category.replace('_', ' ').title()}: {', '.join(available).replace('_', ' ')}")
+                    lines = unit_data.get('amenity_lines')
+                    if lines is None:
+                        lines = amenity_lines(unit_data['amenities'])
+                    for category, available in lines:
+                        st.write(f"• {category}: {available}")
             
             # Quick actions
             st.subheader("Quick Actions")
             action_col1, action_col2, action_col3 = st.columns(3)
             
             with action_col1:
-                # Status update
+                # Status update; the form holds the dropdown's changes until Save
                 status_options = ['available', 'favorite', 'not_interested', 'off_market']
                 current_status = unit_data.get('status', 'available')
                 try:
@@ -82,16 +240,17 @@ def display_unit_details_modal(unit_id: str):
                 except ValueError:
                     status_index = 0
                     
-                new_status = st.selectbox(
-                    "Update Status",
-                    options=status_options,
-                    index=status_index,
-                    key=f"status_select_{unit_id}"
-                )
-                if st.button("Save Status", key=f"save_status_{unit_id}"):
-                    firestore_service.update_unit(unit_id, {'status': new_status})
+                with st.form(f"status_form_{unit_id}", border=False):
+                    new_status = st.selectbox(
+                        "Update Status",
+                        options=status_options,
+                        index=status_index,
+                        key=f"status_select_{unit_id}"
+                    )
+                    submitted = st.form_submit_button("Save Status")
+                if submitted:
+                    save_status(unit_id, new_status)
                     st.success(f"Status updated to '{new_status}'!")
-                    st.cache_data.clear()
                     st.rerun()
             
             with action_col2:
@@ -99,17 +258,15 @@ def display_unit_details_modal(unit_id: str):
                 current_favorite = unit_data.get('favorite', False)
                 if st.button(f"{'Remove from' if current_favorite else 'Add to'} Favorites", 
                            key=f"fav_toggle_{unit_id}"):
-                    firestore_service.update_favorite_status(unit_id, not current_favorite)
+                    submit_write(f"favorite for unit {unit_id}", firestore_service.update_favorite_status,
+                                 unit_id, not current_favorite)
+                    bump_favorites_version()  # membership changed; reload the page
                     st.success(f"Unit {'removed from' if current_favorite else 'added to'} favorites!")
-                    st.cache_data.clear()
                     st.rerun()
             
             with action_col3:
                 # Close modal
-                if st.button("Close Details", key=f"close_details_{unit_id}"):
-                    if 'selected_unit_id' in st.session_state:
-                        del st.session_state.selected_unit_id
-                    st.rerun()
+                st.button("Close Details", key=f"close_details_{unit_id}", on_click=close_unit_details)
                     
     except Exception as e:
         st.error(f"Error loading unit details: {e}")
@@ -122,10 +279,21 @@ st.set_page_config(
 
 st.title("⭐ Favorite Units")
 
-# Load favorite units
+# Load one page of favorite units; the cursor of every page visited is kept for "Previous"
+if 'favorites_cursors' not in st.session_state:
+    st.session_state.favorites_cursors = [None]
+
+# Report background writes that finished since the last run
+collect_finished_writes()
+
 try:
-    favorites_df = firestore_service.get_favorite_units_df()
+    favorites_df, display_df, stats, next_cursor = load_favorites_page()
     
+    if favorites_df.empty and len(st.session_state.favorites_cursors) > 1:
+        # The page emptied (e.g. its units were unfavorited); step back a page
+        st.session_state.favorites_cursors.pop()
+        st.rerun()
+
     if favorites_df.empty:
         st.info("You haven't marked any units as favorites yet.")
         st.page_link("Home.py", label="Browse Units")
@@ -137,107 +305,113 @@ except Exception as e:
     st.stop()
 
 # Display favorites
-st.write(f"**{len(favorites_df)} favorite unit(s)**")
+page_number = len(st.session_state.favorites_cursors)
+st.write(f"**{st.session_state.favorites_page['count']} favorite unit(s)** • page {page_number}")
+pending_writes = pending_write_count()
+if pending_writes:
+    st.caption(f"⏳ Saving {pending_writes} change(s)...")
 
-# Create display columns
-col1, col2 = st.columns([2, 1])
+@st.fragment
+def render_favorites(favorites_df: pd.DataFrame, display_df: pd.DataFrame, stats: dict, next_cursor, page_number: int):
+    """Cards, summary and the selected unit's details; card clicks only rerun this fragment."""
+    selected_id = st.session_state.get('selected_unit_id')
 
-with col1:
-    st.subheader("⭐ Favorite Units")
-    
-    # Check if a unit is selected for details view
-    if 'selected_unit_id' in st.session_state:
-        st.info("💡 **Unit details are shown below the cards.** Click 'Close Details' to select another unit.")
-    
-    # Prepare display data
-    display_df = favorites_df.copy()
+    # Create display columns
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.subheader("⭐ Favorite Units")
     
-    # Clean data types for display to prevent Arrow conversion issues
-    for col in display_df.columns:
-        if col in ['bedrooms', 'parking', 'zip_code', 'square_feet']:
-            # Ensure numeric columns are properly typed
-            display_df[col] = pd.to_numeric(display_df[col], errors='coerce').fillna(0).astype(int)
-        elif col in ['bathrooms']:
-            # Bathrooms can be float
-            display_df[col] = pd.to_numeric(display_df[col], errors='coerce').fillna(0.0)
-        elif col in ['amenities', 'utilities', 'subsidy']:
-            # Convert complex objects to strings for display
-            display_df[col] = display_df[col].astype(str)
+        # Check if a unit is selected for details view
+        if selected_id is not None:
+            st.info("💡 **Unit details are shown below the cards.** Click 'Close Details' to select another unit.")
     
-    # Display units as cards instead of a table
-    for idx, row in display_df.iterrows():
-        unit_id = row.get('id')
-        is_selected = st.session_state.get('selected_unit_id') == unit_id
+        # Display units as cards instead of a table
+        for row in display_df.itertuples(index=False):
+            unit_id = getattr(row, 'id', None)
+            is_selected = unit_id == selected_id
         
-        with st.container(border=True):
-            if is_selected:
-                st.markdown("🔍 **Selected Unit**")
-            
-            # Display key info in columns
-            info_col1, info_col2, info_col3, action_col = st.columns([3, 2, 2, 1])
-            
-            with info_col1:
-                st.write(f"**{row.get('property_address', 'N/A')}** - Unit {row.get('unit', 'N/A')}")
-                st.write(f"📍 {row.get('area', 'N/A')} • {row.get('zip_code', 'N/A')}")
-            
-            with info_col2:
-                st.write(f"🛏️ {row.get('bedrooms', 'N/A')} BR")
-                st.write(f"📐 {row.get('square_feet', 'N/A')} sq ft")
-            
-            with info_col3:
-                status_display = str(row.get('status', 'N/A')).replace('_', ' ').title()
-                st.write(f"⭐ {status_display}")
-                if row.get('parking'):
-                    st.write(f"🚗 {row.get('parking')} parking")
-            
-            with action_col:
+            with st.container(border=True):
+                # All of the card's text goes out as one markdown element
+                status_display = getattr(row, 'status_display', 'N/A')
+                lines = [
+                    f"**{getattr(row, 'property_address', 'N/A')}** - Unit {getattr(row, 'unit', 'N/A')}",
+                    f"📍 {getattr(row, 'area', 'N/A')} • {getattr(row, 'zip_code', 'N/A')}",
+                    f"🛏️ {getattr(row, 'bedrooms', 'N/A')} BR • 📐 {getattr(row, 'square_feet', 'N/A')} sq ft",
+                    f"⭐ {status_display}",
+                ]
                 if is_selected:
-                    # Show close button for selected unit
-                    if st.button("Close Details", key=f"close_{unit_id}", use_container_width=True):
-                        if 'selected_unit_id' in st.session_state:
-                            del st.session_state.selected_unit_id
-                        st.rerun()
-                else:
-                    # Show view details button
-                    if st.button("View Details", key=f"details_{unit_id}", use_container_width=True):
-                        st.session_state.selected_unit_id = unit_id
-                        st.rerun()
-
-with col2:
-    st.subheader("Quick Actions")
+                    lines.insert(0, "🔍 **Selected Unit**")
+                parking = getattr(row, 'parking', None)
+                if parking:
+                    lines[-1] += f" • 🚗 {parking} parking"
+
+                info_col, action_col = st.columns([7, 1])
+                with info_col:
+                    st.markdown("\n\n".join(lines))
+            
+                with action_col:
+                    if is_selected:
+                        # Show close button for selected unit
+                        st.button("Close Details", key=f"close_{unit_id}", use_container_width=True,
+                                  on_click=close_unit_details)
+                    else:
+                        # Show view details button
+                        st.button("View Details", key=f"details_{unit_id}", use_container_width=True,
+                                  on_click=select_unit, args=(unit_id,))
+
+        # Page navigation
+        prev_col, next_col = st.columns(2)
+        with prev_col:
+            if st.button("◀ Previous", disabled=page_number == 1, use_container_width=True):
+                st.session_state.favorites_cursors.pop()
+                st.rerun()
+        with next_col:
+            if st.button("Next ▶", disabled=next_cursor is None, use_container_width=True):
+                st.session_state.favorites_cursors.append(next_cursor)
+                st.rerun()
+
+    with col2:
+        st.subheader("Quick Actions")
     
-    if st.button("🔄 Refresh Favorites", use_container_width=True):
-        st.cache_data.clear()
-        st.rerun()
+        if st.button("🔄 Refresh Favorites", use_container_width=True):
+            clear_unit_caches()
+            st.session_state.favorites_cursors = [None]
+            bump_favorites_version()
+            st.rerun()
     
-    if st.button("🏠 View All Units", use_container_width=True):
-        st.switch_page("Home.py")
+        if st.button("🏠 View All Units", use_container_width=True):
+            st.switch_page("Home.py")
     
-    # Show some stats
-    if not favorites_df.empty:
-        st.subheader("Favorites Summary")
+        # Show some stats
+        if not favorites_df.empty:
+            st.subheader("Favorites Summary (this page)")
         
-        if 'bedrooms' in favorites_df.columns:
-            bedroom_counts = favorites_df['bedrooms'].value_counts().sort_index()
-            st.write("**Bedrooms:**")
-            for bedrooms, count in bedroom_counts.items():
-                st.write(f"• {bedrooms} BR: {count} unit(s)")
+            if 'bedrooms' in stats:
+                st.write("**Bedrooms:**")
+                for bedrooms, count in stats['bedrooms'].items():
+                    st.write(f"• {bedrooms} BR: {count} unit(s)")
         
-        if 'zip_code' in favorites_df.columns:
-            zip_counts = favorites_df['zip_code'].value_counts().head(5)
-            st.write("**Top Zip Codes:**")
-            for zip_code, count in zip_counts.items():
-                st.write(f"• {zip_code}: {count} unit(s)")
+            if 'zips' in stats:
+                st.write("**Top Zip Codes:**")
+                for zip_code, count in stats['zips'].items():
+                    st.write(f"• {zip_code}: {count} unit(s)")
         
-        if 'area' in favorites_df.columns:
-            avg_area = favorites_df['area'].mean()
-            if not pd.isna(avg_area):
-                st.metric("Average Area", f"{int(avg_area)} sq ft")
-
-# Display unit details OUTSIDE the columns, below everything
-if 'selected_unit_id' in st.session_state:
-    st.divider()
-    display_unit_details_modal(st.session_state.selected_unit_id)
+            # 'area' is the neighborhood name; average the unit size instead
+            avg_square_feet = stats.get('avg_square_feet')
+            if avg_square_feet is not None and not pd.isna(avg_square_feet):
+                st.metric("Average Size", f"{int(avg_square_feet)} sq ft")
+
+    # Display unit details OUTSIDE the columns, below everything
+    if selected_id is not None:
+        st.divider()
+        # The loaded page already holds the unit's fields; only fetch units from another page
+        # Pick the one matching row directly rather than re-indexing the whole page per run
+        matches = (favorites_df['id'] == selected_id).to_numpy()
+        selected_row = favorites_df.iloc[matches.argmax()].dropna().to_dict() if matches.any() else None
+        display_unit_details_modal(selected_id, selected_row)
+
+render_favorites(favorites_df, display_df, stats, next_cursor, page_number)
 
 # Back to main page link
 st.divider()
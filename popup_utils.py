@@ -0,0 +1,30 @@
+"""
+Map popup HTML for housing units.
+
+Kept free of Streamlit and Firestore imports so it can be used (and tested)
+without loading the app.
+"""
+
+# Popup HTML for a map marker, as a bound str.format
+POPUP_TMPL = (
+    '<div style="width: 300px; font-family: Arial, sans-serif; font-size: 14px;">'
+    '<h4 style="margin: 0 0 10px 0; color: #2c3e50; font-size: 16px;">{address}</h4>'
+    '<p style="margin: 4px 0;"><strong>Unit:</strong> {unit}</p>'
+    '<p style="margin: 4px 0;"><strong>Status:</strong> {status}</p>'
+    '<p style="margin: 4px 0;"><strong>Bedrooms:</strong> {bedrooms}</p>'
+    '<p style="margin: 4px 0;"><strong>Neighborhood:</strong> {area}</p>'
+    '<p style="margin: 4px 0;"><strong>Size:</strong> {square_feet} sq ft</p>'
+    '</div>'
+).format
+
+
+def create_popup_content(address, unit, status, bedrooms, area, square_feet) -> str:
+    """Create HTML content for a property's popup."""
+    return POPUP_TMPL(
+        address=address,
+        unit=unit,
+        status=str(status).replace('_', ' ').title(),
+        bedrooms=bedrooms,
+        area=area,
+        square_feet=square_feet
+    )
@@ -3,8 +3,7 @@
 Test script to verify URL generation is working correctly
 """
 
-import pandas as pd
-from Home import HousingDataProcessor
+from popup_utils import create_popup_content
 
 # Create a sample row
 sample_data = {
@@ -16,12 +15,15 @@ sample_data = {
     'area': 'Downtown'
 }
 
-# Create a pandas Series to simulate a row
-row = pd.Series(sample_data)
-
 # Test the popup generation
-processor = HousingDataProcessor()
-popup_content = processor.create_popup_content(row)
+popup_content = create_popup_content(
+    sample_data['property_address'],
+    sample_data['unit'],
+    sample_data['status'],
+    sample_data['bedrooms'],
+    sample_data['area'],
+    sample_data.get('square_feet', 'N/A')
+)
 
 print("Generated popup content:")
 print(popup_content)